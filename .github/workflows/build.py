@@ -28,6 +28,10 @@ if sys.stderr is None:
 if sys.stdout is None:
     sys.stdout = monkey_patch()
 
+# 代码格式化进程池在打包后的程序中需要
+import multiprocessing
+multiprocessing.freeze_support()
+
 from dfs_generate.server import app
 
 
@@ -54,6 +58,9 @@ params = [
     "dfs_generate/*:.",
     "--add-data",
     get_pyinstaller_add_data_by_package(pymysql),
+    # pymysql 在首次连接时才导入，需显式声明
+    "--hidden-import",
+    "pymysql",
     "--add-data",
     get_pyinstaller_add_data_by_package(yapf_third_party),
     "--add-data",
@@ -0,0 +1,135 @@
+"""
+合成表结构：生成与 MOCK_COLUMNS / get_table_columns 结构一致的字段行
+"""
+
+import random
+
+_WORDS = (
+    "user",
+    "order",
+    "item",
+    "account",
+    "status",
+    "created",
+    "updated",
+    "price",
+    "amount",
+    "name",
+    "code",
+    "type",
+    "remark",
+    "owner",
+    "group",
+    "level",
+    "count",
+    "total",
+    "address",
+    "phone",
+    "email",
+    "title",
+    "content",
+    "score",
+    "flag",
+)
+_TYPES = (
+    "int",
+    "bigint",
+    "varchar",
+    "varchar",
+    "char",
+    "text",
+    "decimal",
+    "datetime",
+    "timestamp",
+    "date",
+    "tinyint",
+    "json",
+    "double",
+    "blob",
+)
+
+
+def _name(rng, index, words=2):
+    return "_".join(rng.choice(_WORDS) for _ in range(words)) + f"_{index}"
+
+
+def make_column(rng, position, name=None):
+    """随机生成一个字段，不带索引信息"""
+    data_type = rng.choice(_TYPES)
+    column = {
+        "TABLE_NAME": None,
+        "COLUMN_NAME": name or _name(rng, position),
+        "ORDINAL_POSITION": position,
+        "DATA_TYPE": data_type,
+        "IS_NULLABLE": rng.choice(("YES", "NO")),
+        "COLUMN_KEY": "",
+        "COLUMN_COMMENT": rng.choice(("", "", "备注", "创建时间", "用户名称")),
+        "CHARACTER_MAXIMUM_LENGTH": None,
+        "NUMERIC_PRECISION": None,
+        "NUMERIC_SCALE": None,
+        "COLUMN_DEFAULT": None,
+        "EXTRA": "",
+        "NON_UNIQUE": None,
+        "INDEX_NAME": None,
+    }
+    if data_type in ("varchar", "char"):
+        column["CHARACTER_MAXIMUM_LENGTH"] = rng.choice((32, 64, 255))
+    elif data_type == "decimal":
+        column["NUMERIC_PRECISION"], column["NUMERIC_SCALE"] = 12, 2
+    elif data_type in ("int", "bigint", "tinyint"):
+        column["NUMERIC_PRECISION"], column["NUMERIC_SCALE"] = 10, 0
+        if rng.random() < 0.2:
+            column["COLUMN_DEFAULT"] = "0"
+    elif data_type in ("datetime", "timestamp") and rng.random() < 0.3:
+        column["COLUMN_DEFAULT"] = "CURRENT_TIMESTAMP"
+        column["EXTRA"] = rng.choice(
+            ("DEFAULT_GENERATED", "DEFAULT_GENERATED on update CURRENT_TIMESTAMP")
+        )
+    return column
+
+
+def make_table(columns, seed=0, index_ratio=0.2, indexes_per_column=3):
+    """
+    生成一张表的字段行
+    :params columns 字段数
+    :params index_ratio 带索引的字段比例，每个带索引的字段随机属于 1~indexes_per_column
+        个索引，与 COLUMNS 关联 STATISTICS 的结果一样每个索引占一行
+    """
+    rng = random.Random(seed)
+    rows = []
+    primary = make_column(rng, 1, "id")
+    primary.update(
+        DATA_TYPE="bigint",
+        IS_NULLABLE="NO",
+        COLUMN_KEY="PRI",
+        EXTRA="auto_increment",
+        NON_UNIQUE=0,
+        INDEX_NAME="PRIMARY",
+    )
+    rows.append(primary)
+    for position in range(2, columns + 1):
+        column = make_column(rng, position)
+        if rng.random() >= index_ratio:
+            rows.append(column)
+            continue
+        count = rng.randint(1, indexes_per_column)
+        unique = rng.random() < 0.2
+        column["COLUMN_KEY"] = "UNI" if unique else "MUL"
+        for number in range(count):
+            rows.append(
+                {
+                    **column,
+                    "NON_UNIQUE": 0 if unique and number == 0 else 1,
+                    "INDEX_NAME": f"idx_{position}_{number}",
+                }
+            )
+    return rows
+
+
+def make_schema(tables, min_columns=5, max_columns=30, seed=0, **kwargs):
+    """逐张生成 (表名, 字段行)，表数量再多也不会一次占用全部内存"""
+    rng = random.Random(seed)
+    for index in range(tables):
+        name = _name(rng, index, words=rng.randint(1, 3))
+        columns = rng.randint(min_columns, max_columns)
+        yield name, make_table(columns, seed=seed + index, **kwargs)
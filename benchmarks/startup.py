@@ -0,0 +1,109 @@
+"""
+服务端启动耗时基准测试：每轮在新进程中测量
+
+    python -m benchmarks.startup                 # 运行并与基线对比
+    python -m benchmarks.startup --save          # 运行并保存为基线
+
+import: 导入 dfs_generate.server 的耗时
+first_response: 进程启动到首个 / 响应完成的耗时(不经过网络，直接调用 WSGI 应用)
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.run import compare, load_baseline, save_baseline
+
+BASELINE = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import io, time
+start = time.perf_counter()
+from dfs_generate.server import app
+imported = time.perf_counter()
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": "/",
+    "SERVER_NAME": "localhost",
+    "SERVER_PORT": "8080",
+    "wsgi.url_scheme": "http",
+    "wsgi.input": io.BytesIO(),
+    "wsgi.errors": io.StringIO(),
+}
+body = b"".join(app(environ, lambda status, headers, exc_info=None: None))
+done = time.perf_counter()
+print(imported - start, done - start)
+"""
+
+
+def probe(home):
+    """新进程中导入服务端并请求一次 /，返回 (导入耗时, 首个响应耗时)"""
+    # 使用临时 HOME，避免读写本机的缓存数据库
+    env = dict(os.environ, HOME=home)
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    imported, done = output.split()
+    return float(imported), float(done)
+
+
+def run(rounds=10, out=sys.stdout):
+    """取多轮中位数，首轮用于预热字节码缓存不计入"""
+    with tempfile.TemporaryDirectory() as home:
+        os.makedirs(os.path.join(home, ".cache"))
+        probe(home)
+        samples = [probe(home) for _ in range(rounds)]
+    results = {
+        "startup.import": statistics.median(s[0] for s in samples),
+        "startup.first_response": statistics.median(s[1] for s in samples),
+    }
+    for name, seconds in results.items():
+        print(f"{name:<52} {seconds * 1000:>12.4f} ms", file=out, flush=True)
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup", description="服务端启动耗时基准测试"
+    )
+    parser.add_argument("-n", "--rounds", type=int, default=10, help="测量轮数")
+    parser.add_argument("--baseline", default=BASELINE, help="基线文件路径")
+    parser.add_argument("--save", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument(
+        "--threshold", type=float, default=25.0, help="允许变慢的百分比，默认 25"
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run(args.rounds)
+    if args.save:
+        save_baseline(args.baseline, "startup", results)
+        print(f"基线已保存到 {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"未找到基线 {args.baseline}，使用 --save 生成")
+        return 0
+    regressions = compare(results, baseline["results"], args.threshold)
+    for name, base, seconds in regressions:
+        print(
+            f"性能退化 {name}: {base * 1000:.4f} ms -> {seconds * 1000:.4f} ms "
+            f"(+{(seconds / base - 1) * 100:.1f}%)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+from dfs_generate.cli import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+生成代码打包下载：边生成边写入 ZIP，以生成器分段输出
+"""
+
+import logging
+import zipfile
+
+logger = logging.getLogger(__name__)
+# 生成中途出错时写入 ZIP 的错误说明
+ERROR_FILE = "ERROR.txt"
+
+
+class _Stream:
+    """只追加的输出缓冲，不支持 seek，zipfile 会改用数据描述符记录文件大小"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(bundles):
+    """
+    流式生成 ZIP 文件，每写完一组文件就输出已压缩的数据，内存占用与表数量无关
+    响应头已经发出，中途出错时停止生成并写入 ERROR_FILE，输出的仍是完整的 ZIP
+    :params bundles 可迭代的 (目录名, {文件名: 代码})
+    """
+    stream = _Stream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        try:
+            for folder, files in bundles:
+                for name, code in files.items():
+                    archive.writestr(f"{folder}/{name}", code)
+                if data := stream.pop():
+                    yield data
+        except Exception as e:
+            logger.exception("生成 ZIP 失败")
+            archive.writestr(ERROR_FILE, f"生成中断，以下为已生成的部分\n{e!r}\n")
+    # 中央目录在关闭时写入
+    yield stream.pop()
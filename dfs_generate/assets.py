@@ -0,0 +1,115 @@
+"""
+前端静态资源：启动后首次访问时整体读入内存并预先压缩，文件变化后自动重新加载
+"""
+
+import mimetypes
+import os
+import re
+import threading
+import time
+
+import bottle
+
+from dfs_generate.responses import (
+    ENCODINGS,
+    MIN_SIZE,
+    accepted_encoding,
+    compress,
+    entity_tag,
+    not_modified,
+    with_suffix,
+)
+
+# Vite 构建产物文件名带内容哈希，如 assets/index-4ed993c7.js，内容变化时文件名随之变化
+_HASHED = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# 不带哈希的文件(index.html 等)每次使用 ETag 验证
+REVALIDATE = "no-cache"
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg")
+
+
+class Asset:
+    __slots__ = ("body", "encoded", "etag", "content_type", "cache_control")
+
+    def __init__(self, path, body):
+        self.body = body
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith(("text/", "application/javascript")):
+            content_type += "; charset=UTF-8"
+        self.content_type = content_type
+        self.etag = entity_tag(body)
+        self.cache_control = IMMUTABLE if _HASHED.search(path) else REVALIDATE
+        # 预先压缩，只保留比原文件小的编码
+        self.encoded = {}
+        if len(body) >= MIN_SIZE and content_type.startswith(_COMPRESSIBLE):
+            for encoding in ENCODINGS:
+                data = compress(body, encoding)
+                if len(data) < len(body):
+                    self.encoded[encoding] = data
+
+
+class AssetStore:
+    """
+    :params root 静态资源目录(web/dist)
+    :params interval 检查文件变化的最短间隔秒数
+    """
+
+    def __init__(self, root, interval=2.0):
+        self.root = root
+        self.interval = interval
+        self._assets = {}
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        """目录下各文件的 (相对路径, 修改时间, 大小)"""
+        entries = []
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(folder, name)
+                stat = os.stat(path)
+                relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+                entries.append((relative, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+    def load(self):
+        signature = self._scan()
+        assets = {}
+        for relative, _, _ in signature:
+            with open(os.path.join(self.root, relative), "rb") as f:
+                assets[relative] = Asset(relative, f.read())
+        self._assets, self._signature = assets, signature
+
+    def get(self, path):
+        """取出资源，距上次检查超过 interval 时检查文件是否变化"""
+        with self._lock:
+            now = time.monotonic()
+            if self._signature is None or now - self._checked >= self.interval:
+                self._checked = now
+                if self._scan() != self._signature:
+                    self.load()
+            return self._assets.get(path)
+
+    def serve(self, path):
+        """按 Accept-Encoding 返回预压缩的内容，支持 If-None-Match"""
+        asset = self.get(path)
+        if asset is None:
+            return bottle.HTTPError(404, "File does not exist.")
+        response = bottle.response
+        response.content_type = asset.content_type
+        response.set_header("Cache-Control", asset.cache_control)
+        if asset.encoded:
+            response.set_header("Vary", "Accept-Encoding")
+        header = bottle.request.get_header("Accept-Encoding")
+        encoding = accepted_encoding(header, tuple(asset.encoded))
+        if not_modified(asset.etag, encoding):
+            return b""
+
+        body = asset.body
+        if encoding:
+            body = asset.encoded[encoding]
+            response.set_header("Content-Encoding", encoding)
+        response.set_header("ETag", with_suffix(asset.etag, encoding))
+        response.content_length = len(body)
+        return body
@@ -1,12 +1,48 @@
+import hashlib
+import importlib.util
+import json
+import marshal
+from functools import cached_property
 from string import Template
 
+from dfs_generate import __version__
+from dfs_generate.layout import layout, overflows, render_imports, wrap_line
 from dfs_generate.templates import (
     SQLMODEL_DAO,
+    SQLMODEL_DAO_CURSOR,
+    SQLMODEL_DAO_HAS_MORE,
+    SQLMODEL_DAO_OFFSET,
+    SQLMODEL_DAO_WINDOW,
+    SQLMODEL_ASYNC_DAO,
+    SQLMODEL_ASYNC_DAO_CURSOR,
+    SQLMODEL_ASYNC_DAO_HAS_MORE,
+    SQLMODEL_ASYNC_DAO_OFFSET,
+    SQLMODEL_ASYNC_DAO_WINDOW,
+    SQLMODEL_ASYNC_DB,
+    SQLMODEL_ASYNC_LIST_BODIES,
+    SQLMODEL_ASYNC_LIST_ROUTE,
+    SQLMODEL_ASYNC_ROUTER,
     TORTOISE_DAO,
+    TORTOISE_DAO_CURSOR,
+    TORTOISE_DAO_HAS_MORE,
+    TORTOISE_DAO_OFFSET,
+    TORTOISE_DAO_WINDOW,
+    CURSOR_PAGE_RESULT,
+    CURSOR_SCHEMA,
+    CURSOR_SCHEMA_IMPORTS,
+    CURSOR_SLICE_RESULT,
+    SLICE_PAGE_RESULT,
     RESPONSE_SCHEMA,
+    RESPONSE_SCHEMA_IMPORTS,
+    SQLMODEL_LIST_BODIES,
+    SQLMODEL_LIST_ROUTE,
     SQLMODEL_ROUTER,
     SQLMODEL_MAIN,
+    SQLMODEL_MAIN_IMPORTS,
     TORTOISE_MAIN,
+    TORTOISE_MAIN_IMPORTS,
+    TORTOISE_LIST_BODIES,
+    TORTOISE_LIST_ROUTE,
     TORTOISE_ROUTER,
     SQLMODEL_DB,
     VUE_API_TS,
@@ -14,17 +50,17 @@ from dfs_generate.templates import (
     VUE_CRUD_TS,
     REACT_CRUD_TSX
 )
-from dfs_generate.tools import to_pascal, tran, to_snake, to_camel
+from dfs_generate.tools import ColumnInfo, to_pascal, tran, to_snake, to_camel
 
 
-def _pydantic_field(column, imports):
+def _pydantic_field(field, imports):
+    column = field.column
     # 列名
-    name = column["COLUMN_NAME"]
+    name = column.name
     # 类型
-    t = column["DATA_TYPE"]
-    info = tran(t, "pydantic")
+    info = field.pydantic
     end = "None"
-    if desc := column["COLUMN_COMMENT"]:
+    if desc := column.comment:
         end = f"Field(None, description='{desc}')"
         imports.add("from pydantic import Field")
     field = f"{name}: Optional[{info['type']}] = {end}"
@@ -33,34 +69,289 @@ def _pydantic_field(column, imports):
     return field
 
 
-def _fast_crud_column(column):
-    name = to_camel(column["COLUMN_NAME"])
-    title = column["COLUMN_COMMENT"] or name
+def _fast_crud_column(field):
+    name = field.camel
+    title = field.column.comment or name
     fmt = f"{name}: {{ title: '{title}', type: 'text', search: {{ show: true }}}}"
     return fmt
 
 
-def _antd_crud_column(column):
-    name = to_camel(column["COLUMN_NAME"])
-    title = column["COLUMN_COMMENT"] or name
+def _antd_crud_column(field):
+    name = field.camel
+    title = field.column.comment or name
     fmt = f"{{ title: '{title}', dataIndex: '{name}', key: '{name}', supportSearch: true}}"
     return fmt
 
 
+def merge_columns(columns):
+    """
+    合并字段行：COLUMNS 关联 STATISTICS 时字段每属于一个索引占一行，
+    按字段名合并为一个 ColumnInfo 并保持字段顺序，所属索引合并到 indexes
+    :params columns 字段行或 ColumnInfo
+    """
+    merged = {}
+    for column in columns:
+        if isinstance(column, ColumnInfo):
+            # 复制一份，合并索引时不修改传入的对象
+            column = ColumnInfo(*column.astuple())
+        else:
+            column = ColumnInfo.from_row(column)
+        if (current := merged.get(column.name)) is None:
+            merged[column.name] = column
+        else:
+            current.indexes.extend(column.indexes)
+    return list(merged.values())
+
+
+class FieldInfo:
+    """单个字段的中间表示：各目标的类型、命名变体与索引标记只计算一次"""
+
+    __slots__ = (
+        "column",
+        "camel",
+        "pydantic",
+        "tortoise",
+        "primary",
+        "index",
+        "unique",
+    )
+
+    def __init__(self, column: ColumnInfo):
+        self.column = column
+        self.camel = to_camel(column.name)
+        # SQLModel 与 pydantic 使用相同的类型
+        self.pydantic = tran(column.data_type, "pydantic")
+        self.tortoise = tran(column.data_type, "tortoise-orm")
+        self.primary = column.key == "PRI"
+        self.index = column.key == "MUL"
+        self.unique = column.key == "UNI"
+
+
+class TableInfo:
+    """
+    单张表的中间表示，同一张表生成多种模式、多个文件时共享
+    :params columns 字段行或 ColumnInfo，同名字段的多行会合并
+    """
+
+    __slots__ = ("name", "pascal", "snake", "fields", "pk", "cursor_key")
+
+    def __init__(self, name, columns):
+        self.name = name
+        self.pascal = to_pascal(name)
+        self.snake = to_snake(name)
+        self.fields = [FieldInfo(column) for column in merge_columns(columns)]
+        # 主键字段名，有多个时取最后一个，没有时为 None
+        self.pk = None
+        for field in self.fields:
+            if field.primary:
+                self.pk = field.column.name
+        self.cursor_key = self._cursor_key()
+
+    def _cursor_key(self):
+        """游标分页的排序字段：单列主键，其次为第一个非空的唯一字段，都没有时为 None"""
+        primary = [field for field in self.fields if field.primary]
+        if len(primary) == 1:
+            return primary[0].column.name
+        for field in self.fields:
+            if field.unique and not field.column.nullable:
+                return field.column.name
+        return None
+
+
+# 影响生成结果的模块，其中任一源码变化时旧的生成结果都会失效
+_GENERATOR_MODULES = (
+    "dfs_generate.conversion",
+    "dfs_generate.formatter",
+    "dfs_generate.layout",
+    "dfs_generate.templates",
+)
+
+
+def _module_source(name) -> bytes:
+    """模块源码，不导入模块；打包后的桌面程序没有源码时使用字节码"""
+    loader = importlib.util.find_spec(name).loader
+    source = loader.get_source(name)
+    if source is None:
+        return marshal.dumps(loader.get_code(name))
+    return source.encode("utf-8")
+
+
+def _generator_version():
+    """生成器版本：程序版本号加模板、生成与排版逻辑的源码摘要，改动后旧的生成结果自动失效"""
+    digest = hashlib.sha1(__version__.encode("utf-8"))
+    for name in _GENERATOR_MODULES:
+        digest.update(name.encode("utf-8"))
+        digest.update(_module_source(name))
+    return digest.hexdigest()
+
+
+GENERATOR_VERSION = _generator_version()
+# 列表查询的分页方式：offset 按页码，cursor 按主键或唯一字段的游标，深分页耗时与首页相同
+PAGINATIONS = ("offset", "cursor")
+# 列表查询方式：count 先 COUNT 再查询分页；window 用 COUNT(*) OVER() 在同一条语句中统计总数；
+# has_more 不统计总数，多取一条判断是否还有下一页；gather 并发执行 COUNT 与分页查询(仅 tortoise)
+LIST_STRATEGIES = ("count", "window", "has_more", "gather")
+
+
 class Conversion:
-    def __init__(self, table_name, columns, uri):
+    """
+    :params preformatted 直接输出排版好的代码（与 yapf + isort 结果一致），排版未覆盖的文件回退到 yapf + isort
+    :params pagination 分页方式，见 PAGINATIONS
+    :params list_strategy 列表查询方式，见 LIST_STRATEGIES
+    """
+
+    mode = None
+    # 该模式支持的列表查询方式
+    list_strategies = ("count", "window", "has_more")
+    # 文件名 -> 生成方法，主键等依赖都来自 info，各文件可单独生成
+    files = {
+        "model.py": "model",
+        "dao.py": "dao",
+        "router.py": "router",
+        "schema.py": "schema",
+        "main.py": "main",
+        "api.ts": "vue_api_ts",
+        "crud.ts": "vue_crud_ts",
+        "index.vue": "vue_index_vue",
+        "react_curd.tsx": "react_crud_tsx",
+    }
+
+    def __init__(
+        self,
+        table_name,
+        columns,
+        uri,
+        preformatted=False,
+        info=None,
+        pagination="offset",
+        list_strategy="count",
+    ):
+        self.check_options(pagination, list_strategy)
         self.table_name = table_name
         self.columns = columns
         self.uri = uri
-        self.pk = "{'id': id}"
+        self.preformatted = preformatted
+        self.pagination = pagination
+        self.list_strategy = list_strategy
+        if info is not None:
+            self.info = info
+
+    @classmethod
+    def check_options(cls, pagination="offset", list_strategy="count"):
+        """检查生成选项，不合法时抛出 ValueError，不需要表结构，可在批量生成前调用"""
+        if pagination not in PAGINATIONS:
+            raise ValueError(f"不支持的分页方式: {pagination}")
+        if list_strategy not in cls.list_strategies:
+            choices = ", ".join(cls.list_strategies)
+            raise ValueError(f"不支持的列表查询方式: {list_strategy}，可选 {choices}")
+        if pagination == "cursor" and list_strategy == "window":
+            # 窗口函数在游标条件之后计算，只能得到剩余行数
+            raise ValueError("游标分页不支持 window，可使用 count 或 has_more")
+
+    @cached_property
+    def info(self) -> TableInfo:
+        """表的中间表示，各生成方法都从这里读取，可由 conversions() 在多个模式间共享"""
+        return TableInfo(self.table_name, self.columns)
 
     @property
     def table(self):
-        return to_pascal(self.table_name)
+        return self.info.pascal
 
     @property
     def router_name(self):
-        return to_snake(self.table_name)
+        return self.info.snake
+
+    @property
+    def cursor_key(self):
+        if (key := self.info.cursor_key) is None:
+            raise ValueError(
+                f"表 {self.table_name} 没有单列主键或非空唯一字段，不能使用游标分页"
+            )
+        return key
+
+    @property
+    def fingerprint(self):
+        """生成结果的缓存键：字段、模式、连接地址与生成器版本都不变时结果不变"""
+        raw = json.dumps(
+            [
+                self.mode,
+                self.table_name,
+                self.uri,
+                self.preformatted,
+                self.pagination,
+                self.list_strategy,
+                GENERATOR_VERSION,
+                [field.column.astuple() for field in self.info.fields],
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _imports(self, imports):
+        if self.preformatted:
+            return render_imports(imports)
+        return "\n".join(imports)
+
+    def _layout(self, code):
+        return layout(code) if self.preformatted else code
+
+    def _field(self, field):
+        if self.preformatted:
+            return wrap_line("    " + field)
+        return "    " + field
+
+    @property
+    def _query_kind(self):
+        """DAO 中分页查询的写法：cursor / window / has_more / offset"""
+        if self.pagination == "cursor":
+            return "cursor"
+        if self.list_strategy in ("window", "has_more"):
+            return self.list_strategy
+        return "offset"
+
+    def _dao(self, head, queries, imports=None):
+        """
+        公共部分拼接分页查询
+        :params queries {写法: 分页查询模板}，写法见 _query_kind
+        :params imports {写法: 额外的导入语句}
+        """
+        kind = self._query_kind
+        typing = "List, Optional" if kind == "offset" else "List, Optional, Tuple"
+        key = self.cursor_key if kind == "cursor" else None
+        query = queries[kind].format(table=self.table, key=key)
+        extra = "".join("\n" + line for line in (imports or {}).get(kind, ()))
+        content = head.format(
+            typing=typing, imports=extra, table=self.table, pk=self.pk
+        )
+        return self._layout(content + query)
+
+    @property
+    def _page_result(self):
+        """分页查询响应的类名"""
+        names = {
+            ("offset", False): "PageResult",
+            ("cursor", False): "CursorPageResult",
+            ("offset", True): "SlicePageResult",
+            ("cursor", True): "CursorSliceResult",
+        }
+        return names[self.pagination, self.list_strategy == "has_more"]
+
+    def _router(self, template, route, bodies):
+        """:params bodies {(分页方式, 列表查询方式): 分页查询路由的函数体}"""
+        cursor = self.pagination == "cursor"
+        route = Template(route).safe_substitute(
+            summary="游标分页条件查询" if cursor else "分页条件查询",
+            by="cursor" if cursor else "limit",
+            param="CursorParam" if cursor else "PageParam",
+            result=self._page_result,
+            body=bodies[self.pagination, self.list_strategy],
+        )
+        content = Template(template).safe_substitute(list_route=route)
+        content = Template(content).safe_substitute(
+            router_name=self.router_name, table=self.table
+        )
+        return content
 
     def model(self):
         pass
@@ -69,25 +360,30 @@ class Conversion:
         pass
 
     def schema(self):
-        imports = {
-            "from typing import Optional",
-            "from pydantic import BaseModel, Field",
-            "from pydantic.alias_generators import to_camel",
+        imports = set(RESPONSE_SCHEMA_IMPORTS)
+        parts = [RESPONSE_SCHEMA]
+        if self.pagination == "cursor":
+            imports.update(CURSOR_SCHEMA_IMPORTS)
+            parts.append(CURSOR_SCHEMA)
+        results = {
+            "CursorPageResult": [CURSOR_PAGE_RESULT],
+            "SlicePageResult": [SLICE_PAGE_RESULT],
+            "CursorSliceResult": [SLICE_PAGE_RESULT, CURSOR_SLICE_RESULT],
         }
+        parts.extend(results.get(self._page_result, []))
+        response = "\n\n".join(parts)
         head = f"class {self.table}(BaseModel):"
-        fields = []
-        for column in self.columns:
-            field = _pydantic_field(column, imports)
-            if "    " + field not in fields:
-                fields.append("    " + field)
+        fields = [
+            self._field(_pydantic_field(field, imports)) for field in self.info.fields
+        ]
         fields.append(
             "    "
             + 'model_config = {"alias_generator": to_camel, "populate_by_name": True}'
         )
         return (
-                "\n".join(imports)
+                self._imports(imports)
                 + "\n\n"
-                + RESPONSE_SCHEMA
+                + response
                 + "\n\n"
                 + head
                 + "\n"
@@ -106,7 +402,7 @@ class Conversion:
 
     def vue_crud_ts(self):
         columns = (
-                "{" + ",".join(_fast_crud_column(column) for column in self.columns) + "}"
+                "{" + ",".join(_fast_crud_column(field) for field in self.info.fields) + "}"
         )
         return VUE_CRUD_TS % columns
 
@@ -115,71 +411,85 @@ class Conversion:
 
     def react_crud_tsx(self):
         columns = (
-                "[" + ",".join(_antd_crud_column(column) for column in self.columns) + "]"
+                "[" + ",".join(_antd_crud_column(field) for field in self.info.fields) + "]"
         )
         return REACT_CRUD_TSX % (self.table, columns)
 
-    def gencode(self):
-        return {
-            "model.py": self.model(),
-            "dao.py": self.dao(),
-            "router.py": self.router(),
-            "schema.py": self.schema(),
-            "main.py": self.main(),
-            "api.ts": self.vue_api_ts(),
-            "crud.ts": self.vue_crud_ts(),
-            "index.vue": self.vue_index_vue(),
-            "react_curd.tsx": self.react_crud_tsx()
-        }
-
-
-def _sqlmodel_field_repr(column, imports):
-    # 列名
-    info = tran(column["DATA_TYPE"], "pydantic")
+    def gencode(self, files=None, formatter=None):
+        """
+        生成代码 {文件名: 代码}
+        :params files 只生成指定的文件，默认全部，返回顺序与 self.files 一致
+        :params formatter 预排版时，排版未覆盖(仍有超长行)的文件交给它用 yapf + isort 格式化，
+            默认在当前进程内格式化
+        """
+        if files is None:
+            names = list(self.files)
+        else:
+            if unknown := set(files) - self.files.keys():
+                raise ValueError(f"不支持的文件: {', '.join(sorted(unknown))}")
+            names = [name for name in self.files if name in files]
+        results = {name: getattr(self, self.files[name])() for name in names}
+        if self.preformatted:
+            pending = {
+                name: code
+                for name, code in results.items()
+                if name.endswith(".py") and overflows(code)
+            }
+            if pending:
+                from dfs_generate.formatter import Formatter
+
+                formatter = formatter or Formatter(workers=1)
+                results.update(formatter.format_files(pending))
+        return results
+
+
+def _sqlmodel_field_repr(field, imports):
+    column = field.column
+    info = field.pydantic
     _type = info["type"]
     if imported := info["import"]:
         imports.add(imported)
     kwargs = {"default": None}
-    if v := column["CHARACTER_MAXIMUM_LENGTH"]:
+    if v := column.max_length:
         kwargs["max_length"] = v
-    if v := column["NUMERIC_PRECISION"] and _type == "Decimal":
+    if v := column.precision and _type == "Decimal":
         kwargs["max_digits"] = v
-    if v := column["NUMERIC_SCALE"] and _type == "Decimal":
+    if v := column.scale and _type == "Decimal":
         kwargs["decimal_places"] = v
     if _type == "dict":
         imports.add("from sqlmodel import JSON")
         kwargs["sa_type"] = "JSON"
 
-    if column["IS_NULLABLE"] == "YES":
+    if column.nullable:
         kwargs["nullable"] = True
     else:
         kwargs["default"] = "..."
 
-    if v := column["COLUMN_DEFAULT"]:
+    if v := column.default:
         if _type == "int":
             kwargs["default"] = v
 
     # 主键
-    if column["COLUMN_KEY"] == "PRI":
+    if field.primary:
         kwargs["primary_key"] = True
         kwargs["default"] = None
 
     # 描述
-    if desc := column["COLUMN_COMMENT"]:
+    if desc := column.comment:
         kwargs["description"] = '"' + desc + '"'
 
-    if column["EXTRA"] == "DEFAULT_GENERATED":
+    if column.extra == "DEFAULT_GENERATED":
         imports.add("from datetime import datetime")
         kwargs.update({"default_factory": "datetime.utcnow"})
 
-    elif column["EXTRA"].startswith("DEFAULT_GENERATED on update"):
+    elif column.extra.startswith("DEFAULT_GENERATED on update"):
         imports.add("from sqlmodel import func, DateTime, Column")
         kwargs.update({"sa_column": "Column(DateTime(), onupdate=func.now())"})
 
-    if column["COLUMN_KEY"] == "MUL":
+    if field.index:
         kwargs["index"] = True
 
-    if column["COLUMN_KEY"] == "UNI":
+    if field.unique:
         kwargs["unique"] = True
 
     if "default_factory" in kwargs:
@@ -188,7 +498,7 @@ def _sqlmodel_field_repr(column, imports):
     if "sa_column" in kwargs and "nullable" in kwargs:
         kwargs.pop("nullable")
 
-    name = column["COLUMN_NAME"]
+    name = column.name
     if kwargs.get("default", "") is None and "func.now" not in kwargs.get(
             "sa_column", ""
     ):
@@ -202,120 +512,212 @@ def _sqlmodel_field_repr(column, imports):
 
 
 class SQLModelConversion(Conversion):
+    mode = "sqlmodel"
+    files = {**Conversion.files, "db.py": "db"}
+
+    @property
+    def pk(self):
+        return "{'%s': id}" % (self.info.pk or "id")
+
     def model(self):
         imports = {"from sqlmodel import SQLModel, Field"}
         head = f"class {self.table}(SQLModel, table=True):"
         head += f"\n    __tablename__ = '{self.table_name}'"
-        fields = []
-        for column in self.columns:
-            field = _sqlmodel_field_repr(column, imports)
-            if column["COLUMN_KEY"] == "PRI":
-                self.pk = "{" + "'" + column["COLUMN_NAME"] + "': id}"
-            if "    " + field not in fields:
-                fields.append("    " + field)
-        return "\n".join(imports) + "\n\n" + head + "\n" + "\n".join(fields)
+        fields = [
+            self._field(_sqlmodel_field_repr(field, imports))
+            for field in self.info.fields
+        ]
+        return (
+                self._imports(imports)
+                + "\n\n\n"
+                + head
+                + "\n"
+                + "\n".join(fields)
+                + "\n"
+        )
 
     def dao(self):
-        imports = {
-            "from sqlmodel import Session,select, func",
-            "from typing import List, Optional",
-            "import model",
-            "import schema",
+        queries = {
+            "offset": SQLMODEL_DAO_OFFSET,
+            "window": SQLMODEL_DAO_WINDOW,
+            "has_more": SQLMODEL_DAO_HAS_MORE,
+            "cursor": SQLMODEL_DAO_CURSOR,
         }
-        content = SQLMODEL_DAO.format(table=self.table, pk=self.pk)
-        return "\n".join(imports) + "\n\n" + content
+        return self._dao(SQLMODEL_DAO, queries)
 
     def router(self):
-        return Template(SQLMODEL_ROUTER).safe_substitute(
-            router_name=self.router_name, table=self.table
+        content = self._router(
+            SQLMODEL_ROUTER, SQLMODEL_LIST_ROUTE, SQLMODEL_LIST_BODIES
         )
+        return self._layout(content)
 
     def main(self):
-        return SQLMODEL_MAIN.format(router_name=self.router_name)
+        imports = {
+            line.format(router_name=self.router_name) for line in SQLMODEL_MAIN_IMPORTS
+        }
+        content = SQLMODEL_MAIN.format(router_name=self.router_name)
+        return self._imports(imports) + "\n\n" + content
+
+    def db(self):
+        return self._layout(SQLMODEL_DB.format(uri=self.uri))
+
+
+class AsyncSQLModelConversion(SQLModelConversion):
+    """SQLModel 异步模式：模型、schema 与同步模式相同，DAO、路由与数据库连接使用异步接口"""
 
-    def gencode(self):
-        data = super().gencode()
-        data["db.py"] = SQLMODEL_DB.format(uri=self.uri)
-        return data
+    mode = "sqlmodel_async"
 
+    def dao(self):
+        queries = {
+            "offset": SQLMODEL_ASYNC_DAO_OFFSET,
+            "window": SQLMODEL_ASYNC_DAO_WINDOW,
+            "has_more": SQLMODEL_ASYNC_DAO_HAS_MORE,
+            "cursor": SQLMODEL_ASYNC_DAO_CURSOR,
+        }
+        return self._dao(SQLMODEL_ASYNC_DAO, queries)
+
+    def router(self):
+        content = self._router(
+            SQLMODEL_ASYNC_ROUTER, SQLMODEL_ASYNC_LIST_ROUTE, SQLMODEL_ASYNC_LIST_BODIES
+        )
+        return self._layout(content)
 
-def _tortoise_field_repr(column):
-    name = column["COLUMN_NAME"]
-    info = tran(column["DATA_TYPE"], "tortoise-orm")
+    def db(self):
+        uri = self.uri.replace("+pymysql", "+aiomysql")
+        return self._layout(SQLMODEL_ASYNC_DB.format(uri=uri))
+
+
+def _tortoise_field_repr(field):
+    column = field.column
+    name = column.name
+    info = field.tortoise
     kwargs = {}
-    if v := column["IS_NULLABLE"] == "YES":
-        kwargs["null"] = v
-    if v := column["CHARACTER_MAXIMUM_LENGTH"]:
+    if column.nullable:
+        kwargs["null"] = True
+    if v := column.max_length:
         kwargs["max_length"] = v
 
-    if v := column["NUMERIC_PRECISION"] and info["type"] == "Decimal":
+    if v := column.precision and info["type"] == "Decimal":
         kwargs["max_digits"] = v
 
-    if v := column["NUMERIC_SCALE"] and info["type"] == "Decimal":
+    if v := column.scale and info["type"] == "Decimal":
         kwargs["decimal_places"] = v
 
-    if v := column["COLUMN_DEFAULT"]:
+    if v := column.default:
         if info["type"] == "int":
             kwargs["default"] = v
         else:
             kwargs["default"] = f"{v}"
-    if v := column["COLUMN_COMMENT"]:
+    if v := column.comment:
         kwargs["description"] = f'"{v}"'
 
-    if column["COLUMN_KEY"] == "MUL":
+    if field.index:
         kwargs["index"] = True
 
-    if column["EXTRA"] == "DEFAULT_GENERATED":
+    if column.extra == "DEFAULT_GENERATED":
         kwargs["auto_now_add"] = True
         if "default" in kwargs:
             kwargs.pop("default")
 
-    if column["EXTRA"].startswith("DEFAULT_GENERATED on update"):
+    if column.extra.startswith("DEFAULT_GENERATED on update"):
         kwargs["auto_now"] = True
         if "default" in kwargs:
             kwargs.pop("default")
 
-    if column["COLUMN_KEY"] == "UNI":
+    if field.unique:
         kwargs["unique"] = True
 
-    if column["COLUMN_KEY"] == "PRI":
+    if field.primary:
         kwargs["pk"] = True
 
     return f"{name} = fields.{info['type']}({', '.join(f'{k}={v}' for k, v in kwargs.items())})"
 
 
 class TortoiseConversion(Conversion):
+    mode = "tortoise"
+    list_strategies = Conversion.list_strategies + ("gather",)
+
+    @property
+    def pk(self):
+        return f"{self.info.pk}=id" if self.info.pk else "{'id': id}"
+
     def model(self):
         imports = {"from tortoise import Model, fields"}
         head = f"class {self.table}(Model):"
-        fields = []
-        for column in self.columns:
-            field = _tortoise_field_repr(column)
-            if column["COLUMN_KEY"] == "PRI":
-                self.pk = f'{column["COLUMN_NAME"]}=id'
-            if "    " + field not in fields:
-                fields.append("    " + field)
+        fields = [
+            self._field(_tortoise_field_repr(field)) for field in self.info.fields
+        ]
         return (
-                "\n".join(imports)
-                + "\n\n"
+                self._imports(imports)
+                + "\n\n\n"
                 + head
                 + "\n"
                 + "\n".join(fields)
-                + f"\n{' ' * 4}class Meta:\n{' ' * 8}table='{self.table_name}'"
+                + f"\n\n{' ' * 4}class Meta:\n{' ' * 8}table = '{self.table_name}'\n"
         )
 
     def dao(self):
-        imports = {"from typing import List, Optional", "import model", "import schema"}
-        content = TORTOISE_DAO.format(table=self.table, pk=self.pk)
-        return "\n".join(imports) + "\n\n" + content
+        queries = {
+            "offset": TORTOISE_DAO_OFFSET,
+            "window": TORTOISE_DAO_WINDOW,
+            "has_more": TORTOISE_DAO_HAS_MORE,
+            "cursor": TORTOISE_DAO_CURSOR,
+        }
+        imports = {"window": ["from tortoise.expressions import RawSQL"]}
+        return self._dao(TORTOISE_DAO, queries, imports)
 
     def main(self):
-        self.uri = self.uri.replace("+pymysql", "")
-        return Template(TORTOISE_MAIN).safe_substitute(
-            router_name=self.router_name, uri=self.uri
+        uri = self.uri.replace("+pymysql", "")
+        imports = {
+            Template(line).safe_substitute(router_name=self.router_name)
+            for line in TORTOISE_MAIN_IMPORTS
+        }
+        content = Template(TORTOISE_MAIN).safe_substitute(
+            router_name=self.router_name, uri=uri
         )
+        return self._imports(imports) + "\n\n" + self._layout(content)
 
     def router(self):
-        return Template(TORTOISE_ROUTER).safe_substitute(
-            router_name=self.router_name, table=self.table
+        content = self._router(
+            TORTOISE_ROUTER, TORTOISE_LIST_ROUTE, TORTOISE_LIST_BODIES
+        )
+        if self.list_strategy == "gather":
+            content = "import asyncio\n\n" + content
+        return self._layout(content)
+
+
+CONVERSIONS = {
+    "sqlmodel": SQLModelConversion,
+    "sqlmodel_async": AsyncSQLModelConversion,
+    "tortoise": TortoiseConversion,
+}
+
+
+def conversions(table_name, columns, uri, modes, preformatted=False, **options):
+    """
+    同一张表的多个模式，共享一份 TableInfo，字段只解析一次
+    :params options 传给各 Conversion 的生成选项，如 pagination、list_strategy
+    :return {模式: Conversion}
+    """
+    info = TableInfo(table_name, columns)
+    return {
+        mode: CONVERSIONS[mode](
+            table_name, columns, uri, preformatted, info=info, **options
+        )
+        for mode in modes
+    }
+
+
+def batch_conversion(mode, table_name, columns, uri, preformatted=False, **options):
+    """
+    批量生成时创建 Conversion：请求游标分页但表没有单列主键或非空唯一字段时改用 offset 分页，
+    调用方比较 conversion.pagination 与请求的分页方式即可得知是否回退
+    """
+    cls = CONVERSIONS[mode]
+    conversion = cls(table_name, columns, uri, preformatted, **options)
+    if conversion.pagination == "cursor" and conversion.info.cursor_key is None:
+        options = {**options, "pagination": "offset"}
+        conversion = cls(
+            table_name, columns, uri, preformatted, info=conversion.info, **options
         )
+    return conversion
@@ -0,0 +1,465 @@
+"""
+离线读取表结构：解析 mysqldump --no-data 导出的 CREATE TABLE 语句
+
+逐条语句流式解析，生成与 MySQLHelper.get_table_columns 结构一致的字段，
+无需连接数据库，导出文件再大内存占用也只与单条语句有关
+"""
+
+import re
+
+# 与 information_schema 一致的默认精度与长度
+_INTEGER_PRECISION = {
+    "tinyint": 3,
+    "smallint": 5,
+    "mediumint": 7,
+    "int": 10,
+    "bigint": 19,
+}
+_FLOAT_PRECISION = {"float": 12, "double": 22}
+_TEXT_LENGTH = {
+    "tinytext": 255,
+    "tinyblob": 255,
+    "text": 65535,
+    "blob": 65535,
+    "mediumtext": 16777215,
+    "mediumblob": 16777215,
+    "longtext": 4294967295,
+    "longblob": 4294967295,
+}
+_SIZED_STRING = {"char", "varchar", "binary", "varbinary"}
+_TYPE_ALIASES = {
+    "integer": "int",
+    "bool": "tinyint",
+    "boolean": "tinyint",
+    "dec": "decimal",
+    "numeric": "decimal",
+    "fixed": "decimal",
+    "real": "double",
+}
+_CURRENT_TIMESTAMP = {"current_timestamp", "now", "localtime", "localtimestamp"}
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<ident>`(?:[^`]|``)*`)
+      | (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")
+      | (?P<number>[-+]?\d+(?:\.\d+)?)
+      | (?P<word>\w+)
+      | (?P<punct>\S)
+    )""",
+    re.S | re.X,
+)
+# 引号内只需找到转义字符或结束引号
+_QUOTE_END = {
+    "'": re.compile(r"\\.|''|'", re.S),
+    '"': re.compile(r'\\.|""|"', re.S),
+    "`": re.compile(r"``|`"),
+}
+_ESCAPES = {"0": "\0", "b": "\b", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"}
+
+
+def _special(delimiter):
+    """普通状态下需要处理的位置：引号、注释开始与语句分隔符"""
+    return re.compile(r"""['"`]|/\*|#|--(?=\s|$)|""" + re.escape(delimiter))
+
+
+def iter_statements(lines):
+    """
+    按分隔符切分 SQL 语句，跳过注释（包括 /*!...*/ 条件注释），支持 DELIMITER
+    :params lines 可迭代的文本行，如打开的文件
+    """
+    delimiter = ";"
+    special = _special(delimiter)
+    current, quote, block = [], None, False
+    for line in lines:
+        pending = any(part.strip() for part in current)
+        if not pending and quote is None and not block:
+            stripped = line.strip()
+            if stripped[:10].upper() == "DELIMITER ":
+                delimiter = stripped.split()[1]
+                special = _special(delimiter)
+                continue
+        index, start, size = 0, 0, len(line)
+        while index < size:
+            if block:
+                end = line.find("*/", index)
+                if end < 0:
+                    index = start = size
+                    break
+                index = start = end + 2
+                block = False
+            elif quote is not None:
+                match = _QUOTE_END[quote].search(line, index)
+                if match is None:
+                    break
+                if match.group() == quote:
+                    quote = None
+                index = match.end()
+            else:
+                match = special.search(line, index)
+                if match is None:
+                    break
+                token, index = match.group(), match.end()
+                if token in ("'", '"', "`"):
+                    quote = token
+                elif token == "/*":
+                    current.append(line[start : match.start()])
+                    block = True
+                elif token in ("#", "--"):
+                    current.append(line[start : match.start()])
+                    index = start = size
+                else:
+                    current.append(line[start : match.start()])
+                    statement = "".join(current).strip()
+                    current = []
+                    if statement:
+                        yield statement
+                    start = index
+        if start < size:
+            current.append(line[start:])
+    statement = "".join(current).strip()
+    if statement:
+        yield statement
+
+
+def _tokens(statement):
+    tokens = []
+    for match in _TOKEN.finditer(statement):
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+def _unquote(kind, value):
+    if kind == "ident":
+        return value[1:-1].replace("``", "`")
+    if kind != "string":
+        return value
+    quote, body = value[0], value[1:-1]
+    result, index = [], 0
+    while index < len(body):
+        char = body[index]
+        if char == "\\" and index + 1 < len(body):
+            following = body[index + 1]
+            result.append(_ESCAPES.get(following, following))
+            index += 2
+        elif char == quote and body[index + 1 : index + 2] == quote:
+            result.append(quote)
+            index += 2
+        else:
+            result.append(char)
+            index += 1
+    return "".join(result)
+
+
+def _text(tokens):
+    """还原表达式文本，用于表达式默认值等"""
+    text = ""
+    for kind, value in tokens:
+        if text and not (value in "(),." or text.endswith(("(", "."))):
+            text += " "
+        text += value
+    return text
+
+
+def _group(tokens, start):
+    """从 start 处的左括号开始，返回 (括号内按逗号切分的各段, 右括号之后的位置)"""
+    parts, current, depth = [], [], 0
+    for index in range(start, len(tokens)):
+        kind, value = tokens[index]
+        if kind == "punct" and value == "(":
+            depth += 1
+            if depth == 1:
+                continue
+        elif kind == "punct" and value == ")":
+            depth -= 1
+            if depth == 0:
+                parts.append(current)
+                return parts, index + 1
+        elif kind == "punct" and value == "," and depth == 1:
+            parts.append(current)
+            current = []
+            continue
+        current.append(tokens[index])
+    raise ValueError("括号不匹配")
+
+
+def _words(tokens, index, *words):
+    """判断 index 处是否依次为给定关键字"""
+    values = [value.lower() for _, value in tokens[index : index + len(words)]]
+    return values == list(words)
+
+
+def _index_columns(tokens):
+    """索引定义中的字段名，忽略前缀长度与排序方向"""
+    position = next(index for index, (kind, value) in enumerate(tokens) if value == "(")
+    parts, _ = _group(tokens, position)
+    return [_unquote(*part[0]) for part in parts if part]
+
+
+def _parse_index(tokens):
+    """解析表级索引定义，返回 (索引名, 是否唯一, 字段列表)，非索引定义返回 None"""
+    first = tokens[0][1].lower()
+    if first == "constraint":
+        # CONSTRAINT [名称] PRIMARY KEY / UNIQUE / FOREIGN KEY / CHECK
+        name = None
+        if tokens[1][1].lower() not in ("primary", "unique", "foreign", "check"):
+            name, tokens = _unquote(*tokens[1]), tokens[1:]
+        index = _parse_index(tokens[1:])
+        if index and name and index[0] != "PRIMARY":
+            index = (name,) + index[1:]
+        return index
+    if first == "primary":
+        return "PRIMARY", True, _index_columns(tokens)
+    if first in ("unique", "key", "index", "fulltext", "spatial"):
+        position = next(i for i, (_, value) in enumerate(tokens) if value == "(")
+        skip = ("key", "index", "using", "btree", "hash")
+        names = [
+            _unquote(kind, value)
+            for kind, value in tokens[1:position]
+            if kind == "ident" or (kind == "word" and value.lower() not in skip)
+        ]
+        columns = _index_columns(tokens)
+        return (names[0] if names else columns[0]), first == "unique", columns
+    return None
+
+
+def _default(tokens, index):
+    """解析 DEFAULT 之后的值，返回 (默认值, 是否为生成的默认值, 下一个位置)"""
+    kind, value = tokens[index]
+    if kind == "punct" and value == "(":
+        parts, end = _group(tokens, index)
+        return _text(sum(parts, [])), True, end
+    if kind == "word" and value.lower() == "null":
+        return None, False, index + 1
+    if kind == "word" and value.lower() in _CURRENT_TIMESTAMP:
+        end = index + 1
+        text = "CURRENT_TIMESTAMP"
+        if end < len(tokens) and tokens[end][1] == "(":
+            parts, end = _group(tokens, end)
+            if parts[0]:
+                text += f"({_text(parts[0])})"
+        return text, True, end
+    if kind == "word" and value.lower() in ("b", "x") and index + 1 < len(tokens):
+        # 位/十六进制字面量 b'0'
+        following = tokens[index + 1]
+        if following[0] == "string":
+            return value + following[1], False, index + 2
+    if kind == "string":
+        return _unquote(kind, value), False, index + 1
+    return value, False, index + 1
+
+
+def _parse_column(tokens, position):
+    name = _unquote(*tokens[0])
+    data_type = tokens[1][1].lower()
+    index, args = 2, []
+    if data_type == "double" and _words(tokens, index, "precision"):
+        index += 1
+    if index < len(tokens) and tokens[index][1] == "(":
+        parts, index = _group(tokens, index)
+        args = [_unquote(*part[0]) for part in parts if part]
+    column_type = data_type + (
+        "("
+        + ",".join(f"'{arg}'" if data_type in ("enum", "set") else arg for arg in args)
+        + ")"
+        if args
+        else ""
+    )
+
+    nullable, default, default_generated = True, None, False
+    auto_increment, on_update, generated = False, False, None
+    comment, key, charset, collation, unsigned = "", "", None, None, False
+    while index < len(tokens):
+        kind, value = tokens[index]
+        word = value.lower() if kind == "word" else None
+        if word in ("unsigned", "zerofill", "signed"):
+            unsigned = unsigned or word == "unsigned"
+            column_type += f" {word}"
+            index += 1
+        elif _words(tokens, index, "not", "null"):
+            nullable = False
+            index += 2
+        elif word == "null":
+            index += 1
+        elif word == "default":
+            default, default_generated, index = _default(tokens, index + 1)
+        elif word == "auto_increment":
+            auto_increment = True
+            index += 1
+        elif _words(tokens, index, "on", "update"):
+            on_update = True
+            _, _, index = _default(tokens, index + 2)
+        elif word == "comment":
+            comment = _unquote(*tokens[index + 1])
+            index += 2
+        elif _words(tokens, index, "primary", "key"):
+            key = "PRI"
+            index += 2
+        elif word == "unique":
+            key = key or "UNI"
+            index += 2 if _words(tokens, index + 1, "key") else 1
+        elif _words(tokens, index, "character", "set") or word == "charset":
+            index += 2 if word == "charset" else 3
+            charset = tokens[index - 1][1]
+        elif word == "collate":
+            collation = tokens[index + 1][1]
+            index += 2
+        elif word == "as" or _words(tokens, index, "generated", "always"):
+            index += 1 if word == "as" else 3
+            _, index = _group(tokens, index)
+            generated = "VIRTUAL GENERATED"
+        elif word == "stored" and generated:
+            generated = "STORED GENERATED"
+            index += 1
+        else:
+            index += 1
+
+    data_type = _TYPE_ALIASES.get(data_type, data_type)
+    if tokens[1][1].lower() in ("bool", "boolean"):
+        column_type, args = "tinyint(1)", ["1"]
+
+    length = precision = scale = None
+    if data_type in _SIZED_STRING:
+        length = int(args[0]) if args else 1
+    elif data_type in _TEXT_LENGTH:
+        length = _TEXT_LENGTH[data_type]
+    elif data_type == "enum":
+        length = max((len(arg) for arg in args), default=0)
+    elif data_type == "set":
+        length = sum(len(arg) for arg in args) + max(len(args) - 1, 0)
+    elif data_type in _INTEGER_PRECISION:
+        precision = _INTEGER_PRECISION[data_type]
+        if data_type == "bigint" and unsigned:
+            precision = 20
+        scale = 0
+    elif data_type == "decimal":
+        precision = int(args[0]) if args else 10
+        scale = int(args[1]) if len(args) > 1 else 0
+    elif data_type in _FLOAT_PRECISION:
+        precision = int(args[0]) if args else _FLOAT_PRECISION[data_type]
+        scale = int(args[1]) if len(args) > 1 else None
+    elif data_type == "bit":
+        precision = int(args[0]) if args else 1
+
+    extra = []
+    if auto_increment:
+        extra.append("auto_increment")
+    if default_generated:
+        extra.append("DEFAULT_GENERATED")
+    if on_update:
+        extra.append("on update CURRENT_TIMESTAMP")
+    if generated:
+        extra.append(generated)
+    if key == "PRI":
+        nullable = False
+
+    return {
+        "TABLE_SCHEMA": None,
+        "TABLE_NAME": None,
+        "COLUMN_NAME": name,
+        "ORDINAL_POSITION": position,
+        "COLUMN_DEFAULT": default,
+        "IS_NULLABLE": "YES" if nullable else "NO",
+        "DATA_TYPE": data_type,
+        "CHARACTER_MAXIMUM_LENGTH": length,
+        "NUMERIC_PRECISION": precision,
+        "NUMERIC_SCALE": scale,
+        "CHARACTER_SET_NAME": charset,
+        "COLLATION_NAME": collation,
+        "COLUMN_TYPE": column_type,
+        "COLUMN_KEY": key,
+        "EXTRA": " ".join(extra),
+        "COLUMN_COMMENT": comment,
+    }
+
+
+def parse_create_table(statement):
+    """
+    解析单条 CREATE TABLE 语句
+    :return (表名, 字段列表)，字段每属于一个索引占一行，与 get_table_columns 一致；
+        不是 CREATE TABLE 语句时返回 None
+    """
+    tokens = _tokens(statement)
+    index = 1
+    if not _words(tokens, 0, "create"):
+        return None
+    if _words(tokens, index, "temporary"):
+        index += 1
+    if not _words(tokens, index, "table"):
+        return None
+    index += 1
+    if _words(tokens, index, "if", "not", "exists"):
+        index += 3
+    # 可能带库名 `db`.`table`
+    table_name = _unquote(*tokens[index])
+    index += 1
+    while tokens[index][1] == ".":
+        table_name = _unquote(*tokens[index + 1])
+        index += 2
+    if tokens[index][1] != "(":
+        # CREATE TABLE ... LIKE / AS SELECT 无法得到字段
+        return None
+    definitions, _ = _group(tokens, index)
+
+    columns, indexes = [], []
+    for definition in definitions:
+        if not definition:
+            continue
+        if definition[0][0] == "ident":
+            columns.append(_parse_column(definition, len(columns) + 1))
+        elif found := _parse_index(definition):
+            indexes.append(found)
+        elif definition[0][1].lower() not in ("check", "foreign", "constraint"):
+            columns.append(_parse_column(definition, len(columns) + 1))
+
+    by_name = {column["COLUMN_NAME"]: column for column in columns}
+    memberships = {name: [] for name in by_name}
+    for name, unique, index_columns in indexes:
+        for position, column_name in enumerate(index_columns):
+            if column_name not in by_name:
+                continue
+            memberships[column_name].append((0 if unique else 1, name))
+            column = by_name[column_name]
+            if name == "PRIMARY":
+                column["COLUMN_KEY"] = "PRI"
+                column["IS_NULLABLE"] = "NO"
+            elif position != 0:
+                continue
+            # 与 information_schema 一致：单列唯一索引为 UNI，联合唯一索引与普通索引的首列为 MUL
+            elif unique and len(index_columns) == 1 and column["COLUMN_KEY"] != "PRI":
+                column["COLUMN_KEY"] = "UNI"
+            elif not column["COLUMN_KEY"]:
+                column["COLUMN_KEY"] = "MUL"
+    # 字段定义中直接声明的 PRIMARY KEY / UNIQUE 也是索引
+    for column in columns:
+        names = [name for _, name in memberships[column["COLUMN_NAME"]]]
+        if column["COLUMN_KEY"] == "PRI" and "PRIMARY" not in names:
+            memberships[column["COLUMN_NAME"]].append((0, "PRIMARY"))
+        elif column["COLUMN_KEY"] == "UNI" and not names:
+            memberships[column["COLUMN_NAME"]].append((0, column["COLUMN_NAME"]))
+
+    rows = []
+    for column in columns:
+        column["TABLE_NAME"] = table_name
+        no_index = [(None, None)]
+        for non_unique, index_name in memberships[column["COLUMN_NAME"]] or no_index:
+            rows.append({**column, "NON_UNIQUE": non_unique, "INDEX_NAME": index_name})
+    return table_name, rows
+
+
+def iter_dump(lines, tables=None):
+    """
+    流式读取 mysqldump 导出文件中的表结构
+    :params lines 可迭代的文本行，如 open(path, encoding="utf-8")
+    :params tables 只读取指定的表，None 表示全部
+    :return 逐个生成 (表名, 字段列表)
+    """
+    wanted = set(tables) if tables is not None else None
+    for statement in iter_statements(lines):
+        if statement[:6].upper() != "CREATE":
+            continue
+        result = parse_create_table(statement)
+        if result is None:
+            continue
+        if wanted is None or result[0] in wanted:
+            yield result
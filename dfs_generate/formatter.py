@@ -0,0 +1,80 @@
+"""
+生成代码格式化：yapf(pep8) + isort，支持多进程并行
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import isort
+from yapf.yapflib.yapf_api import FormatCode
+
+
+def format_code(name, code):
+    """格式化单个文件，非 Python 文件原样返回"""
+    if name.endswith("py"):
+        code = FormatCode(code, style_config="pep8")[0]
+        code = isort.code(code)
+    return code
+
+
+def _format_item(item):
+    return format_code(*item)
+
+
+def _default_workers():
+    if workers := os.environ.get("DFS_FORMAT_WORKERS"):
+        return int(workers)
+    return os.cpu_count() or 1
+
+
+class Formatter:
+    """
+    代码格式化器，yapf 受 GIL 限制，多个文件放到进程池中并行格式化
+    :params workers 进程数，默认读取环境变量 DFS_FORMAT_WORKERS，否则为 CPU 核数；
+        小于等于 1 或进程池不可用时在当前进程内格式化
+    """
+
+    def __init__(self, workers=None):
+        self.workers = _default_workers() if workers is None else workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self.workers <= 1:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                except (OSError, NotImplementedError):
+                    # 部分平台不支持多进程，降级为进程内格式化
+                    self.workers = 1
+            return self._executor
+
+    def format_files(self, files: dict) -> dict:
+        """格式化单张表生成的文件 {文件名: 代码}"""
+        return dict(zip(files, self._map(list(files.items()))))
+
+    def _map(self, items):
+        python_items = [item for item in items if item[0].endswith("py")]
+        executor = self._get_executor() if len(python_items) > 1 else None
+        if executor is None:
+            return [format_code(*item) for item in items]
+
+        chunksize = max(1, len(python_items) // (self.workers * 4))
+        try:
+            results = executor.map(_format_item, python_items, chunksize=chunksize)
+            results = iter(list(results))
+        except BrokenProcessPool:
+            # 工作进程异常退出时丢弃进程池，本次在当前进程内完成
+            self.shutdown()
+            return [format_code(*item) for item in items]
+        return [next(results) if name.endswith("py") else code for name, code in items]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
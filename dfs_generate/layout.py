@@ -0,0 +1,256 @@
+"""
+生成代码排版：按 PEP 8 直接输出与 yapf(pep8) + isort 一致的代码，避免再跑一遍格式化
+
+只覆盖生成器自身会产生的写法：排序分组的导入语句、以及单行过长的函数定义与调用；
+yapf 需要按罚分取舍的写法(如参数中的调用还要再拆分)不做处理，保留超长行，由 overflows 判断后回退到 yapf
+"""
+
+import io
+import sys
+import tokenize
+
+COLUMN_LIMIT = 79
+
+_STDLIB = set(getattr(sys, "stdlib_module_names", ())) | {"__future__"}
+
+
+def _name_key(name):
+    """isort 默认的 order_by_type：常量、类、其他，同类内忽略大小写"""
+    if name.isupper() and len(name) > 1:
+        prefix = "A"
+    elif name[:1].isupper():
+        prefix = "B"
+    else:
+        prefix = "C"
+    return prefix + name.lower()
+
+
+def _grid(statement, names):
+    """isort 默认的 GRID 换行方式"""
+    line = statement + "(" + names[0]
+    white_space = " " * len(statement + "(")
+    for name in names[1:]:
+        if len((line + ", " + name).split("\n")[-1]) + 1 > COLUMN_LIMIT:
+            line += ",\n" + white_space + name
+        else:
+            line += ", " + name
+    return line + ")"
+
+
+def render_imports(imports) -> str:
+    """
+    按 isort 默认配置输出导入语句：标准库在前、第三方在后，
+    分组内先 import 后 from，同模块的 from 导入合并
+    :params imports 单行导入语句集合，如 "from typing import Optional"
+    """
+    sections = {"stdlib": ({}, set()), "thirdparty": ({}, set())}
+    for line in imports:
+        words = line.split()
+        module = words[1]
+        section = "stdlib" if module.split(".")[0] in _STDLIB else "thirdparty"
+        froms, straights = sections[section]
+        if words[0] == "import":
+            straights.add(module)
+        else:
+            names = "".join(words[3:]).split(",")
+            froms.setdefault(module, set()).update(filter(None, names))
+
+    blocks = []
+    for froms, straights in sections.values():
+        lines = [f"import {module}" for module in sorted(straights, key=str.lower)]
+        for module in sorted(froms, key=str.lower):
+            names = sorted(froms[module], key=_name_key)
+            statement = f"from {module} import "
+            if len(statement + ", ".join(names)) > COLUMN_LIMIT:
+                lines.append(_grid(statement, names))
+            else:
+                lines.append(statement + ", ".join(names))
+        if lines:
+            blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def _tokens(text):
+    reader = io.StringIO(text + "\n").readline
+    skip = {tokenize.NEWLINE, tokenize.NL, tokenize.ENDMARKER}
+    return [tok for tok in tokenize.generate_tokens(reader) if tok.type not in skip]
+
+
+def _split_args(text, tokens):
+    """按最外层逗号切分参数，返回 (参数列表, 是否含关键字参数/默认值)"""
+    args, named, depth, start = [], False, 0, 0
+    for tok in tokens:
+        column = tok.start[1]
+        if tok.string in "([{":
+            depth += 1
+        elif tok.string in ")]}":
+            depth -= 1
+        elif depth == 0 and tok.string == ",":
+            args.append(text[start:column].strip())
+            start = tok.end[1]
+        elif depth == 0 and tok.string == "=":
+            named = True
+    args.append(text[start:].strip())
+    return [arg for arg in args if arg], named
+
+
+def _fits(lines):
+    return all(len(row) <= COLUMN_LIMIT for line in lines for row in line.split("\n"))
+
+
+def _pack(args, named, column, tail, first=None):
+    """
+    以 column 为起始列排列参数，tail 接在最后一个参数后
+    含关键字参数时每行一个，否则尽量多地放在一行
+    """
+    prefix = first if first is not None else " " * column
+    rows, current = [], prefix + args[0]
+    for index, arg in enumerate(args[1:], 1):
+        end = tail if index == len(args) - 1 else ","
+        candidate = current + ", " + arg
+        if not named and len(candidate + end) <= COLUMN_LIMIT:
+            current = candidate
+        else:
+            rows.append((current, ","))
+            current = " " * column + arg
+    rows.append((current, tail))
+
+    # 单个参数仍然过长时不再拆分参数中的调用：yapf 此时按罚分在多种写法间选择，
+    # 超长行原样保留，由调用方改用 yapf 格式化(见 overflows)
+    return [row + end for row, end in rows]
+
+
+def wrap_line(line, trailer="") -> str:
+    """
+    排版单行语句：规范参数间的空格，超出 79 列时按 yapf(pep8) 的方式换行
+    依次尝试：单行、与左括号对齐、悬挂缩进
+    :params trailer 嵌套拆分时紧跟在语句后的外层符号，如 ")" 或 ","
+    """
+    indent = len(line) - len(line.lstrip())
+    text = line.strip()
+    try:
+        tokens = _tokens(text)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return line + trailer
+    is_def = text.startswith(("def ", "async def "))
+
+    # 定义取参数列表的括号，其余取行尾调用的括号
+    stack, pairs = [], []
+    for index, tok in enumerate(tokens):
+        if tok.string in "([{":
+            stack.append(index)
+        elif tok.string in ")]}":
+            opening = stack.pop()
+            if not stack and tokens[opening].string == "(":
+                pairs.append((opening, index))
+    if is_def and pairs:
+        opening, closing = pairs[0]
+    elif pairs and pairs[-1][1] == len(tokens) - 1:
+        opening, closing = pairs[-1]
+    else:
+        return line + trailer
+
+    head = text[: tokens[opening].end[1]]
+    tail = text[tokens[closing].start[1] :] + trailer
+    inner = text[tokens[opening].end[1] : tokens[closing].start[1]]
+    offset = tokens[opening].end[1]
+    inner_tokens = [
+        tok._replace(start=(1, tok.start[1] - offset), end=(1, tok.end[1] - offset))
+        for tok in tokens[opening + 1 : closing]
+    ]
+    args, named = _split_args(inner, inner_tokens)
+    prefix = " " * indent + head
+    single = prefix + ", ".join(args) + tail
+    if not args or len(single) <= COLUMN_LIMIT:
+        return single
+
+    # 与左括号对齐
+    column = len(prefix)
+    lines = _pack(args, named, column, tail, first=prefix)
+    if _fits(lines):
+        return "\n".join(lines)
+    if not is_def and (
+        len(lines[-1]) - len(tail) <= COLUMN_LIMIT
+        or any(
+            len(row) > COLUMN_LIMIT and ("(" in row[column:] or "[" in row[column:])
+            for row in lines
+        )
+    ):
+        # 只有右括号超出、或参数中的调用与下标需要再拆分时，yapf 按罚分选择写法，
+        # 保留原行交给 yapf
+        return line + trailer
+    if is_def and named:
+        lines = _pack(args, named, column, "", first=prefix)
+        lines.append(" " * column + tail)
+        if _fits(lines):
+            return "\n".join(lines)
+
+    # 悬挂缩进
+    if is_def:
+        last = args[-1] + tail
+        continuation = 8 if named or len(last) + indent + 4 <= COLUMN_LIMIT else 4
+    else:
+        continuation = 4
+    column = indent + continuation
+    lines = [prefix, " " * column + ", ".join(args) + tail]
+    if _fits(lines):
+        return "\n".join(lines)
+    lines = [prefix] + _pack(args, named, column, tail)
+    if _fits(lines) or not is_def:
+        return "\n".join(lines)
+    joined = " " * column + ", ".join(args)
+    if len(joined) < COLUMN_LIMIT:
+        return "\n".join([prefix, joined, " " * indent + tail])
+    lines = [prefix] + _pack(args, named, column, "")
+    lines.append(" " * indent + tail)
+    return "\n".join(lines)
+
+
+def overflows(code) -> bool:
+    """
+    是否有超出 79 列的行，多行字符串中的内容除外
+    排版只覆盖生成器常见的写法，无法排版的行原样保留，调用方据此改用 yapf + isort
+    """
+    long_rows = {
+        row for row, line in enumerate(code.split("\n"), 1) if len(line) > COLUMN_LIMIT
+    }
+    if not long_rows:
+        return False
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type == tokenize.STRING and tok.end[0] > tok.start[0]:
+                long_rows.difference_update(range(tok.start[0] + 1, tok.end[0] + 1))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return True
+    return bool(long_rows)
+
+
+def layout(code) -> str:
+    """对整段代码中超出 79 列的单行语句换行，多行字符串等保持不变"""
+    lines = code.split("\n")
+    long_rows = {
+        row
+        for row, line in enumerate(lines, 1)
+        if len(line) > COLUMN_LIMIT and line.strip()
+    }
+    if not long_rows:
+        return code
+
+    # 只处理独占一行的逻辑行，跳过多行字符串中的内容
+    single_rows, start = set(), None
+    reader = io.StringIO(code).readline
+    for tok in tokenize.generate_tokens(reader):
+        if start is None and tok.type not in (
+            tokenize.NL,
+            tokenize.INDENT,
+            tokenize.DEDENT,
+            tokenize.COMMENT,
+        ):
+            start = tok.start[0]
+        if tok.type == tokenize.NEWLINE:
+            if start == tok.start[0]:
+                single_rows.add(start)
+            start = None
+    for row in long_rows & single_rows:
+        lines[row - 1] = wrap_line(lines[row - 1])
+    return "\n".join(lines)
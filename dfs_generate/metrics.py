@@ -0,0 +1,124 @@
+"""
+请求各阶段耗时：写入 Server-Timing 响应头，并按接口、阶段汇总为 Prometheus 格式的指标
+"""
+
+import contextlib
+import threading
+import time
+from collections import defaultdict, deque
+
+import bottle
+
+# environ 中保存本次请求的开始时间、各阶段耗时与进行中阶段的内层耗时
+_START = "dfs.start"
+_TIMINGS = "dfs.timings"
+_NESTED = "dfs.nested"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Summary:
+    """
+    按标签汇总耗时：累计次数与总和，分位数取最近 window 次的样本计算
+    :params window 每组标签保留的样本数
+    """
+
+    def __init__(self, name, help_text, window=1024):
+        self.name = name
+        self.help_text = help_text
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, seconds):
+        """:params labels ((标签名, 值), ...)"""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0, 0.0, deque(maxlen=self.window)]
+            series[0] += 1
+            series[1] += seconds
+            series[2].append(seconds)
+
+    def quantiles(self, labels: tuple) -> dict:
+        with self._lock:
+            samples = sorted(self._series[labels][2])
+        return {
+            q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in QUANTILES
+        }
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} summary"]
+        with self._lock:
+            items = sorted(
+                (labels, count, total)
+                for labels, (count, total, _) in self._series.items()
+            )
+        for labels, count, total in items:
+            text = ",".join(f'{k}="{v}"' for k, v in labels)
+            for q, value in self.quantiles(labels).items():
+                lines.append(f'{self.name}{{{text},quantile="{q}"}} {value:.6f}')
+            lines.append(f"{self.name}_sum{{{text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{text}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+stage_seconds = Summary("dfs_stage_seconds", "各接口每个处理阶段的耗时(秒)")
+
+
+def _timings():
+    """本次请求的阶段耗时，不在请求内(如后台线程)时返回 None"""
+    try:
+        return bottle.request.environ.setdefault(_TIMINGS, defaultdict(float))
+    except (AttributeError, RuntimeError, KeyError):
+        return None
+
+
+@contextlib.contextmanager
+def timed(stage):
+    """
+    记录一个阶段的耗时，同一请求内同名阶段累加
+    阶段嵌套时(如 convert 中的 format)内层耗时只计入内层，各阶段互不重叠
+    """
+    timings = _timings()
+    if timings is None:
+        yield
+        return
+    nested = bottle.request.environ.setdefault(_NESTED, [])
+    nested.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[stage] += elapsed - nested.pop()
+        if nested:
+            nested[-1] += elapsed
+
+
+def start_request():
+    bottle.request.environ[_START] = time.perf_counter()
+
+
+def finish_request():
+    """设置 Server-Timing 响应头并汇总本次请求的各阶段耗时"""
+    environ = bottle.request.environ
+    start = environ.get(_START)
+    route = environ.get("bottle.route")
+    if start is None or route is None:
+        return
+    timings = dict(environ.get(_TIMINGS) or {})
+    timings["total"] = time.perf_counter() - start
+    # Server-Timing 的 dur 单位为毫秒
+    header = ", ".join(f"{k};dur={v * 1000:.2f}" for k, v in timings.items())
+    bottle.response.set_header("Server-Timing", header)
+    for stage, seconds in timings.items():
+        stage_seconds.observe((("endpoint", route.rule), ("stage", stage)), seconds)
+
+
+def render() -> str:
+    """Prometheus 文本格式"""
+    return stage_seconds.render()
@@ -0,0 +1,155 @@
+"""
+JSON 响应的条件请求与压缩
+
+after_request 钩子无法替换响应体，因此以装饰器包装路由：
+序列化 JSON、设置强 ETag、匹配 If-None-Match 时返回 304，超过阈值时按 Accept-Encoding 压缩
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+
+import bottle
+
+from dfs_generate.metrics import timed
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时只使用 gzip
+    brotli = None
+
+# 小于该字节数的响应不压缩
+MIN_SIZE = 1024
+# 可用的压缩编码，按优先级排列
+ENCODINGS = ("gzip",) if brotli is None else ("br", "gzip")
+# 压缩后的表示在 ETag 后追加编码后缀，同一内容的各编码视为同一版本
+_SUFFIXES = ("-br", "-gzip")
+
+
+def entity_tag(*parts) -> str:
+    """由内容或表结构指纹等生成强 ETag"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def _split(tag):
+    """拆分为 (不带编码后缀的 ETag, 编码)"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in _SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[: -len(suffix) - 1] + '"', suffix[1:]
+    return tag, None
+
+
+def _strip(tag):
+    return _split(tag)[0]
+
+
+def etag_matches(etag, header) -> bool:
+    """If-None-Match 是否命中，忽略弱标记与编码后缀"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_strip(tag) == etag for tag in header.split(","))
+
+
+def accepted_encodings(header) -> set:
+    """Accept-Encoding 中接受的编码名称"""
+    accepted = set()
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip(" 0.") == "":
+            # q=0 表示不接受
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def accepted_encoding(header, available=("br", "gzip")):
+    """按 Accept-Encoding 从可用编码中选择，优先 br，不接受压缩时返回 None"""
+    accepted = accepted_encodings(header)
+    for encoding in available:
+        if encoding == "br" and brotli is None:
+            continue
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data)
+    # mtime 固定为 0，相同内容压缩结果一致
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def with_suffix(etag, encoding):
+    return etag[:-1] + f'-{encoding}"' if encoding else etag
+
+
+def _held_encoding(etag, header):
+    """客户端所持表示的编码：命中的 If-None-Match 中带的编码后缀，当前请求仍接受该编码时有效"""
+    accepted = accepted_encodings(bottle.request.get_header("Accept-Encoding"))
+    for tag in header.split(","):
+        base, encoding = _split(tag)
+        if base == etag and encoding in accepted:
+            return encoding
+    return None
+
+
+def not_modified(etag, encoding=...) -> bool:
+    """
+    请求的 If-None-Match 命中时设置 304，路由可直接返回
+    304 的 ETag 与 200 时一致，带上压缩编码后缀
+    :params encoding 本次响应使用的编码，路由提前调用时未知，沿用客户端所持表示的编码
+    """
+    header = bottle.request.get_header("If-None-Match")
+    if not etag_matches(etag, header):
+        return False
+    if encoding is ...:
+        encoding = _held_encoding(etag, header)
+    bottle.response.status = 304
+    bottle.response.set_header("ETag", with_suffix(etag, encoding))
+    return True
+
+
+def conditional(func):
+    """
+    路由装饰器：返回值序列化为 JSON，支持 ETag 条件请求与压缩
+    路由可先调用 not_modified(etag) 跳过生成，或设置 ETag 响应头，否则按内容生成 ETag
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        body = func(*args, **kwargs)
+        response = bottle.response
+        if response.status_code == 304:
+            return b""
+        with timed("serialize"):
+            if isinstance(body, (dict, list)):
+                body = json.dumps(body).encode("utf-8")
+                response.content_type = "application/json"
+            etag = response.get_header("ETag") or entity_tag(body)
+        response.set_header("Vary", "Accept-Encoding")
+        encoding = None
+        if len(body) >= MIN_SIZE:
+            encoding = accepted_encoding(bottle.request.get_header("Accept-Encoding"))
+        if not_modified(etag, encoding):
+            return b""
+
+        if encoding:
+            with timed("compress"):
+                body = compress(body, encoding)
+            response.set_header("Content-Encoding", encoding)
+        response.set_header("ETag", with_suffix(etag, encoding))
+        return body
+
+    return wrapper
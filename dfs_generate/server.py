@@ -1,20 +1,46 @@
+import functools
+import logging
 import os
+import threading
 
 import bottle
-import isort
-from yapf.yapflib.yapf_api import FormatCode
 
-from dfs_generate.conversion import SQLModelConversion, TortoiseConversion
-from dfs_generate.tools import Cache, MySQLConf, MySQLHelper
+from dfs_generate import metrics
+from dfs_generate.assets import AssetStore
+from dfs_generate.metrics import timed
+from dfs_generate.responses import conditional, entity_tag, not_modified
+from dfs_generate.tools import (
+    Cache,
+    MetadataCache,
+    MySQLConf,
+    MySQLHelper,
+    TableIndexCache,
+    close_pools,
+    get_pool,
+)
+from dfs_generate.watch import SchemaWatcher
 
+logger = logging.getLogger(__name__)
 app = bottle.Bottle()
+# 首次读写时才打开 sqlite，代码生成与数据库驱动也在首次使用时才导入，加快启动
 cache = Cache()
-cache.start()
+metadata = MetadataCache()
+table_indexes = TableIndexCache()
 
 # 解决打包桌面程序static找不到的问题
 static_file_abspath = os.path.join(
     os.path.dirname(os.path.dirname(__file__)), "web", "dist"
 )
+assets = AssetStore(static_file_abspath)
+# /download 每批查询字段的表数量，导出整库时内存只与批大小有关
+DOWNLOAD_BATCH_SIZE = 100
+
+
+def _mysql(conf: MySQLConf = None):
+    """从连接池取连接，默认使用已保存的配置"""
+    conf = conf or MySQLConf(**cache.get())
+    with timed("connect"):
+        return MySQLHelper(conf, pool=get_pool(conf))
 
 
 @app.hook("before_request")
@@ -23,34 +49,40 @@ def validate():
     access_control = bottle.request.environ.get("HTTP_ACCESS_CONTROL_REQUEST_METHOD")
     if request_method == "OPTIONS" and access_control:
         bottle.request.environ["REQUEST_METHOD"] = access_control
+    metrics.start_request()
 
 
 @app.hook("after_request")
 def enable_cors():
     bottle.response.headers["Access-Control-Allow-Origin"] = "*"
     bottle.response.headers["Access-Control-Allow-Headers"] = "*"
+    metrics.finish_request()
+
+
+@app.get("/metrics")
+def get_metrics():
+    """各接口每个阶段耗时的次数与 p50/p95/p99，Prometheus 文本格式"""
+    bottle.response.content_type = "text/plain; version=0.0.4; charset=utf-8"
+    return metrics.render()
 
 
 # 定义路由，提供静态文件服务
 @app.get("/static/<filepath:path>")
 def serve_static(filepath):
-    return bottle.static_file(filepath, root=static_file_abspath)
+    return assets.serve(filepath)
 
 
 # 定义首页路由
 @app.get("/")
 def index():
-    with open(os.path.join(static_file_abspath, "index.html"), "rb") as f:
-        html_content = f.read()
-    bottle.response.content_type = "text/html"
-    return html_content
+    return assets.serve("index.html")
 
 
 # 连接数据库
 @app.get("/con")
 def connect():
-    if cache.get():
-        return {"code": 20000, "msg": "ok", "data": cache.get()}
+    if data := cache.get():
+        return {"code": 20000, "msg": "ok", "data": data}
     return {"code": 40000, "msg": "error", "data": None}
 
 
@@ -58,52 +90,296 @@ def connect():
 def configure():
     payload = bottle.request.json
     try:
-        with MySQLHelper(MySQLConf(**payload)):
-            cache.set(**MySQLConf(**payload).json())
+        conf = MySQLConf(**payload)
+        with _mysql(conf):
+            cache.set(**conf.json())
+        # 旧配置的连接池不会再被取用，关闭其中的连接
+        close_pools(keep=conf)
         return {"code": 20000, "msg": "ok", "data": None}
     except Exception as e:
         return {"code": 40000, "msg": str(e), "data": None}
 
 
 @app.get("/tables")
+@conditional
 def get_tables():
-    like = bottle.request.query.get("tableName")
+    """
+    查询表名
+    :params tableName 关键字
+    :params match prefix 前缀匹配 / substring 子串匹配(默认)
+    :params ignoreCase 为 1 时忽略大小写
+    :params offset limit 分页，不传 limit 时返回全部
+    """
+    query = bottle.request.query
+    like = query.get("tableName", "")
+    match = query.get("match", "substring")
+    ignore_case = query.get("ignoreCase") in ("1", "true")
     try:
-        with MySQLHelper(MySQLConf(**cache.get())) as obj:
-            data = [
-                {"tableName": table, "key": table}
-                for table in obj.get_tables()
-                if like in table
-            ]
-            return {"code": 20000, "msg": "ok", "data": data}
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if query.get("limit") else None
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset、limit 不能为负数")
+        with _mysql() as obj, timed("introspect"):
+            index = table_indexes.get_index(obj)
+        with timed("search"):
+            total, tables = index.search(like, match, ignore_case, offset, limit)
+        data = [{"tableName": table, "key": table} for table in tables]
+        return {"code": 20000, "msg": "ok", "data": data, "total": total}
     except Exception as e:
         return {"code": 40000, "msg": str(e), "data": None}
 
 
+def _kind(mode):
+    """sqlmodel、sqlmodel_async 以外均按 tortoise 生成"""
+    from dfs_generate.conversion import CONVERSIONS
+
+    return mode if mode in CONVERSIONS else "tortoise"
+
+
+class _TimedFormatter:
+    """格式化耗时计入 format 阶段"""
+
+    def __init__(self, formatter):
+        self.formatter = formatter
+
+    def format_files(self, files: dict) -> dict:
+        with timed("format"):
+            return self.formatter.format_files(files)
+
+
+@functools.lru_cache(maxsize=None)
+def _formatter():
+    """共享的格式化进程池，首次需要时才导入 yapf 并创建"""
+    from dfs_generate.formatter import Formatter
+
+    return _TimedFormatter(Formatter())
+
+
+def _results(data):
+    return [{"name": k, "code": v, "key": k} for k, v in data.items()]
+
+
+def _gencode(conversion, files=None, store=True):
+    """
+    生成代码并缓存，表结构未变化时直接返回已生成的代码
+    :params files 只生成指定的文件，按文件缓存；已缓存全部文件时从中取出
+    :params store 为 False 时只读取缓存，不写入(批量导出不挤占交互生成的缓存)
+    """
+    key = conversion.fingerprint
+    with timed("cache"):
+        results = cache.get_code(key)
+    if files is None:
+        if results is None:
+            # 预排版覆盖不了的文件(仍有超长行)在进程池中用 yapf + isort 格式化
+            with timed("convert"):
+                results = _results(conversion.gencode(formatter=_formatter()))
+            if store:
+                with timed("cache"):
+                    cache.set_code(key, results)
+        return results
+    if results is not None:
+        return [item for item in results if item["name"] in files]
+
+    cached, missing = {}, []
+    with timed("cache"):
+        for name in files:
+            if (item := cache.get_code(f"{key}/{name}")) is not None:
+                cached[name] = item[0]
+            else:
+                missing.append(name)
+    if missing:
+        with timed("convert"):
+            generated = _results(conversion.gencode(missing, _formatter()))
+        with timed("cache"):
+            for item in generated:
+                cache.set_code(f"{key}/{item['name']}", [item])
+                cached[item["name"]] = item
+    return [cached[name] for name in conversion.files if name in cached]
+
+
+def _prepare(obj: MySQLHelper, table, modes, files=None, **options):
+    """
+    创建各模式的 Conversion，字段只查询、解析一次
+    :params options 生成选项，如 pagination、list_strategy
+    :return {模式: (Conversion, 该模式下要生成的文件)}
+    """
+    from dfs_generate.conversion import CONVERSIONS, conversions
+
+    kinds = {mode: _kind(mode) for mode in modes}
+    if files is not None:
+        known = set().union(*(CONVERSIONS[kind].files for kind in kinds.values()))
+        if unknown := set(files) - known:
+            raise ValueError(f"不支持的文件: {', '.join(sorted(unknown))}")
+    with timed("introspect"):
+        columns = metadata.get_table_columns(obj, table)
+    with timed("convert"):
+        items = conversions(
+            table,
+            columns,
+            obj.conf.db_uri,
+            set(kinds.values()),
+            preformatted=True,
+            **options,
+        )
+    prepared = {}
+    for mode, kind in kinds.items():
+        conversion, selected = items[kind], files
+        if files is not None:
+            # 指定的文件不属于该模式时(如 tortoise 没有 db.py)跳过
+            selected = [name for name in files if name in conversion.files]
+        prepared[mode] = (conversion, selected)
+    return prepared
+
+
+def _generate_modes(obj: MySQLHelper, table, modes, files=None, **options):
+    """
+    生成单张表多个模式的代码
+    :return {模式: [{name, code, key}, ...]}
+    """
+    prepared = _prepare(obj, table, modes, files, **options)
+    return {mode: _gencode(*item) for mode, item in prepared.items()}
+
+
+def _options(query):
+    """请求参数中的生成选项"""
+    return {
+        "pagination": query.get("pagination") or "offset",
+        "list_strategy": query.get("listStrategy") or "count",
+    }
+
+
 @app.get("/codegen")
+@conditional
 def codegen():
+    """
+    :params mode sqlmodel / sqlmodel_async / tortoise，逗号分隔多个模式时(如 sqlmodel,tortoise)，data 为 {模式: 文件列表}
+    :params files 逗号分隔的文件名(如 model.py,dao.py)，只生成这些文件，默认全部
+    :params pagination 列表查询的分页方式 offset(默认) / cursor
+    :params listStrategy 列表查询方式 count(默认) / window / has_more / gather(仅 tortoise)
+    ETag 由各模式的生成指纹与所选文件得出，表结构不变时返回 304
+    """
     table = bottle.request.query.get("tableName")
     mode = bottle.request.query.get("mode")
-    results = []
-    if mode == "sqlmodel":
-        _instance = SQLModelConversion
-    else:
-        _instance = TortoiseConversion
+    modes = mode.split(",") if mode else [mode]
+    files = bottle.request.query.get("files")
+    files = [f for f in files.split(",") if f] if files else None
+    options = _options(bottle.request.query)
     try:
-        with MySQLHelper(MySQLConf(**cache.get())) as obj:
-            data = _instance(
-                table, obj.get_table_columns(table), obj.conf.db_uri
-            ).gencode()
+        with _mysql() as obj:
+            prepared = _prepare(obj, table, modes, files, **options)
+            etag = entity_tag(
+                mode,
+                files,
+                *(conversion.fingerprint for conversion, _ in prepared.values()),
+            )
+            if not_modified(etag):
+                return None
+            data = {mode: _gencode(*item) for mode, item in prepared.items()}
     except Exception as e:
         return {"code": 40000, "msg": str(e), "data": None}
 
-    for k, v in data.items():
-        if k.endswith("py"):
-            _code = FormatCode(v, style_config="pep8")[0]
-            v = isort.code(_code)
-        results.append({"name": k, "code": v, "key": k})
+    bottle.response.set_header("ETag", etag)
+    results = data if len(modes) > 1 else data[mode]
     return {"code": 20000, "msg": "ok", "data": results}
 
 
+def _bundles(conf: MySQLConf, tables, mode, options):
+    """
+    返回逐张表生成代码的生成器，未指定表时导出整个数据库
+    连接失败、表不存在、生成选项不合法等错误在开始输出前抛出；没有游标字段的表改用 offset 分页
+    字段按 DOWNLOAD_BATCH_SIZE 张表一批查询，查询后立即归还连接，生成结果不写入代码缓存
+    """
+    from dfs_generate.conversion import CONVERSIONS, batch_conversion
+
+    kind = _kind(mode)
+    CONVERSIONS[kind].check_options(**options)
+    with _mysql(conf) as obj:
+        with timed("introspect"):
+            existing = obj.get_tables()
+    names = set(existing)
+    if missing := [table for table in tables if table not in names]:
+        raise ValueError(f"表不存在: {', '.join(missing)}")
+    tables = tables or sorted(existing)
+
+    def generate():
+        for start in range(0, len(tables), DOWNLOAD_BATCH_SIZE):
+            batch = tables[start : start + DOWNLOAD_BATCH_SIZE]
+            with _mysql(conf) as obj:
+                with timed("introspect"):
+                    columns = obj.get_schema_columns(batch)
+            for table in batch:
+                conversion = batch_conversion(
+                    kind, table, columns.pop(table, []), conf.db_uri, True, **options
+                )
+                if conversion.pagination != options["pagination"]:
+                    logger.warning(
+                        "表 %s 没有单列主键或非空唯一字段，改用 offset 分页", table
+                    )
+                results = _gencode(conversion, store=False)
+                yield table, {item["name"]: item["code"] for item in results}
+
+    return generate()
+
+
+@app.get("/download")
+def download():
+    """
+    下载生成的项目 ZIP，按表分目录，边生成边输出
+    :params tables 逗号分隔的表名，为空时导出全部表
+    :params pagination listStrategy 同 /codegen
+    """
+    from dfs_generate.archive import stream_zip
+
+    mode = bottle.request.query.get("mode")
+    tables = [t for t in bottle.request.query.get("tables", "").split(",") if t]
+    if not (data := cache.get()):
+        return {"code": 40000, "msg": "error", "data": None}
+    conf = MySQLConf(**data)
+    try:
+        bundles = _bundles(conf, tables, mode, _options(bottle.request.query))
+    except Exception as e:
+        return {"code": 40000, "msg": str(e), "data": None}
+    bottle.response.content_type = "application/zip"
+    bottle.response.set_header(
+        "Content-Disposition", f'attachment; filename="{conf.db}.zip"'
+    )
+    return stream_zip(bundles)
+
+
+def _warm(obj: MySQLHelper, tables):
+    """表结构变化后预先生成各模式的代码写入缓存"""
+    from dfs_generate.conversion import CONVERSIONS
+
+    for table in tables:
+        _generate_modes(obj, table, tuple(CONVERSIONS))
+
+
+def watch_schema(interval, stop: threading.Event = None):
+    """
+    后台监听当前配置的数据库，只为结构变化的表重新生成代码
+    首次轮询只记录基线；切换数据库配置后重新记录基线
+    """
+    stop = stop or threading.Event()
+    watcher, notify = None, False
+    while not stop.is_set():
+        if data := cache.get():
+            conf = MySQLConf(**data)
+            if watcher is None or watcher.conf != conf:
+                watcher, notify = SchemaWatcher(conf, _warm, interval), False
+            try:
+                watcher.tick(notify)
+                notify = True
+            except Exception:
+                logger.exception("表结构轮询失败")
+        stop.wait(interval)
+
+
+# 设置 DFS_WATCH_INTERVAL(秒) 时启动表结构监听
+if watch_interval := os.environ.get("DFS_WATCH_INTERVAL"):
+    threading.Thread(
+        target=watch_schema, args=(float(watch_interval),), daemon=True
+    ).start()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8080, debug=True, reloader=True)
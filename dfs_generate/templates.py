@@ -9,23 +9,32 @@ DOC_DESC = """
 支持前端: [Vue](https://cn.vuejs.org/)、[React](https://react.dev/)
 """
 
-RESPONSE_SCHEMA = """
-from typing import Generic, TypeVar, List, Optional
-from pydantic import BaseModel
+# Python 模板按 yapf(pep8) + isort 的结果排版，预排版模式下可直接输出
+
+RESPONSE_SCHEMA_IMPORTS = {
+    "from typing import Generic, TypeVar, List, Optional",
+    "from pydantic import BaseModel, Field",
+    "from pydantic.alias_generators import to_camel",
+}
+
+RESPONSE_SCHEMA = """\
 T = TypeVar('T')
+
+
 class Result(BaseModel, Generic[T]):
     success: bool = Field(..., description="是否成功")
     message: str = Field(..., description="额外消息")
     data: Optional[T] = Field(None, description="响应数据")
 
     @classmethod
-    def ok(cls, data: T, message: str="成功"):
+    def ok(cls, data: T, message: str = "成功"):
         return cls(data=data, message=message, success=True)
 
     @classmethod
     def error(cls, message: str = "失败"):
         return cls(data=None, message=message, success=False)
 
+
 class PageResult(Result[T]):
     total: int = Field(0, description="数据总数")
     data: List[T] = Field(default_factory=list, description="响应数据")
@@ -34,25 +43,106 @@ class PageResult(Result[T]):
     def ok(cls, data: List[T], message: str = "成功", total: int = 0):
         return cls(data=data, total=total, message=message, success=True)
 
+
 class PageParam(BaseModel):
     page_number: int = Field(1, description="页码")
     page_size: int = Field(10, description="每页数量")
 
     model_config = {"alias_generator": to_camel, "populate_by_name": True}
+"""
+
+# 游标分页：按主键或非空唯一字段递增翻页，游标为该字段值的 base64 编码，对调用方不透明
+CURSOR_SCHEMA_IMPORTS = {"import base64", "import json"}
+
+CURSOR_SCHEMA = """\
+class CursorParam(BaseModel):
+    cursor: Optional[str] = Field(None,
+                                  description="上一页返回的 nextCursor，为空时查询第一页")
+    page_size: int = Field(10, description="每页数量")
+
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+
+
+def encode_cursor(value) -> str:
+    raw = json.dumps(value, default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+"""
+
+# 分页查询的响应：按分页方式与是否统计总数选择
+CURSOR_PAGE_RESULT = """\
+class CursorPageResult(PageResult[T]):
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空时没有更多数据")
+
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+
+    @classmethod
+    def ok(cls,
+           data: List[T],
+           message: str = "成功",
+           total: int = 0,
+           next_cursor: Optional[str] = None):
+        return cls(data=data,
+                   total=total,
+                   next_cursor=next_cursor,
+                   message=message,
+                   success=True)
+"""
+
+SLICE_PAGE_RESULT = """\
+class SlicePageResult(Result[T]):
+    has_more: bool = Field(False, description="是否还有下一页")
+    data: List[T] = Field(default_factory=list, description="响应数据")
+
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+
+    @classmethod
+    def ok(cls, data: List[T], message: str = "成功", has_more: bool = False):
+        return cls(data=data, has_more=has_more, message=message, success=True)
+"""
+
+CURSOR_SLICE_RESULT = """\
+class CursorSliceResult(SlicePageResult[T]):
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空时没有更多数据")
 
+    @classmethod
+    def ok(cls,
+           data: List[T],
+           message: str = "成功",
+           next_cursor: Optional[str] = None):
+        return cls(data=data,
+                   has_more=next_cursor is not None,
+                   next_cursor=next_cursor,
+                   message=message,
+                   success=True)
 """
 
-SQLMODEL_DAO = """
+# DAO 由公共部分与分页查询拼接，{typing} 为 typing 导入的名称，{imports} 为额外的导入
+
+SQLMODEL_DAO = """\
+from typing import {typing}
+
+import model
+import schema{imports}
+from sqlmodel import Session, func, select
+
+
 def create(session: Session, obj_in: schema.{table}) -> model.{table}:
-    obj = model.{table}(**obj_in.model_dump(exclude_unset=True))
+    data = obj_in.model_dump(exclude_unset=True)
+    obj = model.{table}(**data)
     session.add(obj)
     session.commit()
     session.refresh(obj)
     return obj
 
+
 def query_by_id(session: Session, id: int) -> Optional[model.{table}]:
     return session.get(model.{table}, {pk})
 
+
 def update(session: Session, id: int, obj_in: schema.{table}) -> Optional[model.{table}]:
     obj = query_by_id(session, id)
     if obj:
@@ -63,6 +153,7 @@ def update(session: Session, id: int, obj_in: schema.{table}) -> Optional[model.
         session.refresh(obj)
     return obj
 
+
 def delete_by_id(session: Session, id: int) -> Optional[model.{table}]:
     obj = query_by_id(session, id)
     if obj:
@@ -70,76 +161,170 @@ def delete_by_id(session: Session, id: int) -> Optional[model.{table}]:
         session.commit()
     return obj
 
+
 def count(session: Session, **kwargs) -> int:
-    return session.scalar(
-select(func.count()).
-select_from(model.{table}).filter_by(**kwargs)
-)
+    stmt = select(func.count()).select_from(model.{table})
+    return session.scalar(stmt.filter_by(**kwargs))
+"""
+
+SQLMODEL_DAO_OFFSET = """\
+
 
 def query_all_by_limit(session: Session, page_number: int, page_size: int, **kwargs) -> List[model.{table}]:
-    stmt = select(model.{table}).filter_by(**kwargs).offset((page_number - 1) * page_size).limit(page_size)
+    stmt = select(model.{table})
+    stmt = stmt.filter_by(**kwargs)
+    stmt = stmt.offset((page_number - 1) * page_size).limit(page_size)
     return session.exec(stmt).all()
 """
 
-SQLMODEL_ROUTER = """
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
-import schema
+# 同一条语句中用窗口函数统计总数(MySQL 8.0+)
+SQLMODEL_DAO_WINDOW = """\
+
+
+def query_all_by_limit(session: Session, page_number: int, page_size: int, **kwargs) -> Tuple[List[model.{table}], int]:
+    stmt = select(model.{table}, func.count().over())
+    stmt = stmt.filter_by(**kwargs)
+    stmt = stmt.offset((page_number - 1) * page_size).limit(page_size)
+    rows = session.exec(stmt).all()
+    if not rows:
+        total = count(session, **kwargs) if page_number > 1 else 0
+        return [], total
+    return [row[0] for row in rows], rows[0][1]
+"""
+
+# 不统计总数，多取一条判断是否还有下一页
+SQLMODEL_DAO_HAS_MORE = """\
+
+
+def query_all_by_limit(session: Session, page_number: int, page_size: int, **kwargs) -> Tuple[List[model.{table}], bool]:
+    stmt = select(model.{table})
+    stmt = stmt.filter_by(**kwargs)
+    stmt = stmt.offset((page_number - 1) * page_size).limit(page_size + 1)
+    data = session.exec(stmt).all()
+    return data[:page_size], len(data) > page_size
+"""
+
+# 多取一条判断是否还有下一页
+SQLMODEL_DAO_CURSOR = """\
+
+
+def query_all_by_cursor(session: Session, cursor: Optional[str], page_size: int, **kwargs) -> Tuple[List[model.{table}], Optional[str]]:
+    column = model.{table}.{key}
+    stmt = select(model.{table})
+    stmt = stmt.filter_by(**kwargs)
+    if cursor:
+        stmt = stmt.where(column > schema.decode_cursor(cursor))
+    stmt = stmt.order_by(column).limit(page_size + 1)
+    data = session.exec(stmt).all()
+    if len(data) <= page_size:
+        return data, None
+    data = data[:page_size]
+    return data, schema.encode_cursor(data[-1].{key})
+"""
+
+SQLMODEL_ROUTER = """\
 import dao
-from db import engine
+import schema
+from db import SessionDep
+from fastapi import APIRouter, Depends
 
 $router_name = APIRouter(prefix="/$table", tags=["$table"])
 
+
 @$router_name.get("/{id}", summary="通过ID查询详情")
-def query_${router_name}_by_id(id: int) -> schema.Result[schema.$table]:
-    with Session(engine) as session:
-        return schema.Result.ok(dao.query_by_id(session, id))
+def query_${router_name}_by_id(id: int, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(dao.query_by_id(session, id))
 
-@$router_name.get("", summary="分页条件查询")
-def query_${router_name}_all_by_limit(query: schema.$table = Depends(), page: schema.PageParam = Depends()) -> schema.PageResult[schema.$table]:
-    with Session(engine) as session:
-        total = dao.count(session, **query.model_dump(exclude_none=True))
-        data = dao.query_all_by_limit(session, **query.model_dump(exclude_none=True), page_number=page.page_number, page_size=page.page_size)
-        return schema.PageResult.ok(data=data, total=total)
+
+$list_route
 
 
 @$router_name.post("", summary="新增数据")
-def create_${router_name}(instance: schema.$table) -> schema.Result[schema.$table]:
-    with Session(engine) as session:
-        return schema.Result.ok(dao.create(session, instance))
+def create_${router_name}(instance: schema.$table, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(dao.create(session, instance))
 
 
 @$router_name.patch("/{id}", summary="更新数据")
-def update_${router_name}_by_id(id: int, instance: schema.$table) -> schema.Result[schema.$table]:
-    with Session(engine) as session:
-        return schema.Result.ok(dao.update(session, id, instance))
+def update_${router_name}_by_id(id: int, instance: schema.$table, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(dao.update(session, id, instance))
 
 
 @$router_name.delete("/{id}", summary="删除数据")
-def delete_${router_name}_by_id(id: int) -> schema.Result[schema.$table]:
-    with Session(engine) as session:
-        return schema.Result.ok(dao.delete_by_id(session, id))
+def delete_${router_name}_by_id(id: int, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(dao.delete_by_id(session, id))
 """
 
-SQLMODEL_DB = """
-from sqlmodel import create_engine
+# 分页查询路由，替换路由模板中的 $list_route，$body 按 (分页方式, 列表查询方式) 选择
+SQLMODEL_LIST_ROUTE = """\
+@$router_name.get("", summary="$summary")
+def query_${router_name}_all_by_$by(
+    session: SessionDep,
+    query: schema.$table = Depends(),
+    page: schema.$param = Depends()
+) -> schema.$result[schema.$table]:
+$body"""
+
+SQLMODEL_LIST_BODIES = {
+    ("offset", "count"): """\
+    total = dao.count(session, **query.model_dump(exclude_none=True))
+    data = dao.query_all_by_limit(session, **query.model_dump(exclude_none=True), page_number=page.page_number, page_size=page.page_size)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("offset", "window"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, total = dao.query_all_by_limit(session, page.page_number, page.page_size, **kwargs)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("offset", "has_more"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, has_more = dao.query_all_by_limit(session, page.page_number, page.page_size, **kwargs)
+    return schema.SlicePageResult.ok(data=data, has_more=has_more)""",
+    ("cursor", "count"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    total = dao.count(session, **kwargs)
+    data, next_cursor = dao.query_all_by_cursor(session, page.cursor, page.page_size, **kwargs)
+    return schema.CursorPageResult.ok(data=data, total=total, next_cursor=next_cursor)""",
+    ("cursor", "has_more"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, next_cursor = dao.query_all_by_cursor(session, page.cursor, page.page_size, **kwargs)
+    return schema.CursorSliceResult.ok(data=data, next_cursor=next_cursor)""",
+}
 
-db_uri = "{uri}"
+# 连接池参数可通过环境变量调整；路由通过 SessionDep 依赖 get_session，请求结束后关闭会话、归还连接
+SQLMODEL_DB = """\
+import os
+from typing import Annotated, Iterator
 
-engine = create_engine(db_uri)
-"""
+from fastapi import Depends
+from sqlmodel import Session, create_engine
+
+db_uri = os.getenv("DB_URI", "{uri}")
+
+engine = create_engine(
+    db_uri,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+)
 
-SQLMODEL_MAIN = (
-    """
-from fastapi import FastAPI
-from starlette.middleware.cors import CORSMiddleware
+
+def get_session() -> Iterator[Session]:
+    with Session(engine) as session:
+        yield session
 
 
-from router import {router_name}
+SessionDep = Annotated[Session, Depends(get_session)]
+"""
 
+SQLMODEL_MAIN_IMPORTS = {
+    "from fastapi import FastAPI",
+    "from starlette.middleware.cors import CORSMiddleware",
+    "from router import {router_name}",
+}
 
-app = FastAPI(title="DFS - FastAPI SQLModel CRUD", 
-description='''%s''')
+SQLMODEL_MAIN = (
+    """\
+app = FastAPI(title="DFS - FastAPI SQLModel CRUD",
+              description='''%s''')
 
 app.add_middleware(
     CORSMiddleware,
@@ -158,62 +343,311 @@ if __name__ == '__main__':
     % DOC_DESC
 )
 
+# SQLModel 异步：AsyncEngine + AsyncSession，路由为 async def，无需占用线程池
+
+SQLMODEL_ASYNC_DAO = """\
+from typing import {typing}
+
+import model
+import schema{imports}
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+async def create(session: AsyncSession, obj_in: schema.{table}) -> model.{table}:
+    data = obj_in.model_dump(exclude_unset=True)
+    obj = model.{table}(**data)
+    session.add(obj)
+    await session.commit()
+    await session.refresh(obj)
+    return obj
+
+
+async def query_by_id(session: AsyncSession, id: int) -> Optional[model.{table}]:
+    return await session.get(model.{table}, {pk})
+
+
+async def update(session: AsyncSession, id: int, obj_in: schema.{table}) -> Optional[model.{table}]:
+    obj = await query_by_id(session, id)
+    if obj:
+        for field, value in obj_in.model_dump(exclude_unset=True).items():
+            setattr(obj, field, value)
+        session.add(obj)
+        await session.commit()
+        await session.refresh(obj)
+    return obj
+
+
+async def delete_by_id(session: AsyncSession, id: int) -> Optional[model.{table}]:
+    obj = await query_by_id(session, id)
+    if obj:
+        await session.delete(obj)
+        await session.commit()
+    return obj
+
+
+async def count(session: AsyncSession, **kwargs) -> int:
+    stmt = select(func.count()).select_from(model.{table})
+    return await session.scalar(stmt.filter_by(**kwargs))
+"""
+
+SQLMODEL_ASYNC_DAO_OFFSET = """\
+
+
+async def query_all_by_limit(session: AsyncSession, page_number: int, page_size: int, **kwargs) -> List[model.{table}]:
+    stmt = select(model.{table})
+    stmt = stmt.filter_by(**kwargs)
+    stmt = stmt.offset((page_number - 1) * page_size).limit(page_size)
+    return (await session.exec(stmt)).all()
+"""
+
+SQLMODEL_ASYNC_DAO_WINDOW = """\
+
+
+async def query_all_by_limit(session: AsyncSession, page_number: int, page_size: int, **kwargs) -> Tuple[List[model.{table}], int]:
+    stmt = select(model.{table}, func.count().over())
+    stmt = stmt.filter_by(**kwargs)
+    stmt = stmt.offset((page_number - 1) * page_size).limit(page_size)
+    rows = (await session.exec(stmt)).all()
+    if not rows:
+        total = await count(session, **kwargs) if page_number > 1 else 0
+        return [], total
+    return [row[0] for row in rows], rows[0][1]
+"""
+
+SQLMODEL_ASYNC_DAO_HAS_MORE = """\
+
+
+async def query_all_by_limit(session: AsyncSession, page_number: int, page_size: int, **kwargs) -> Tuple[List[model.{table}], bool]:
+    stmt = select(model.{table})
+    stmt = stmt.filter_by(**kwargs)
+    stmt = stmt.offset((page_number - 1) * page_size).limit(page_size + 1)
+    data = (await session.exec(stmt)).all()
+    return data[:page_size], len(data) > page_size
+"""
+
+SQLMODEL_ASYNC_DAO_CURSOR = """\
+
+
+async def query_all_by_cursor(session: AsyncSession, cursor: Optional[str], page_size: int, **kwargs) -> Tuple[List[model.{table}], Optional[str]]:
+    column = model.{table}.{key}
+    stmt = select(model.{table})
+    stmt = stmt.filter_by(**kwargs)
+    if cursor:
+        stmt = stmt.where(column > schema.decode_cursor(cursor))
+    stmt = stmt.order_by(column).limit(page_size + 1)
+    data = (await session.exec(stmt)).all()
+    if len(data) <= page_size:
+        return data, None
+    data = data[:page_size]
+    return data, schema.encode_cursor(data[-1].{key})
+"""
+
+SQLMODEL_ASYNC_ROUTER = """\
+import dao
+import schema
+from db import SessionDep
+from fastapi import APIRouter, Depends
+
+$router_name = APIRouter(prefix="/$table", tags=["$table"])
+
+
+@$router_name.get("/{id}", summary="通过ID查询详情")
+async def query_${router_name}_by_id(id: int, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(await dao.query_by_id(session, id))
+
+
+$list_route
+
+
+@$router_name.post("", summary="新增数据")
+async def create_${router_name}(instance: schema.$table, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(await dao.create(session, instance))
+
+
+@$router_name.patch("/{id}", summary="更新数据")
+async def update_${router_name}_by_id(id: int, instance: schema.$table, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(await dao.update(session, id, instance))
+
+
+@$router_name.delete("/{id}", summary="删除数据")
+async def delete_${router_name}_by_id(id: int, session: SessionDep) -> schema.Result[schema.$table]:
+    return schema.Result.ok(await dao.delete_by_id(session, id))
+"""
+
+SQLMODEL_ASYNC_LIST_ROUTE = """\
+@$router_name.get("", summary="$summary")
+async def query_${router_name}_all_by_$by(
+    session: SessionDep,
+    query: schema.$table = Depends(),
+    page: schema.$param = Depends()
+) -> schema.$result[schema.$table]:
+$body"""
+
+# 同一个 AsyncSession 不能并发执行，不支持 gather
+SQLMODEL_ASYNC_LIST_BODIES = {
+    ("offset", "count"): """\
+    total = await dao.count(session, **query.model_dump(exclude_none=True))
+    data = await dao.query_all_by_limit(session, **query.model_dump(exclude_none=True), page_number=page.page_number, page_size=page.page_size)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("offset", "window"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, total = await dao.query_all_by_limit(session, page.page_number, page.page_size, **kwargs)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("offset", "has_more"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, has_more = await dao.query_all_by_limit(session, page.page_number, page.page_size, **kwargs)
+    return schema.SlicePageResult.ok(data=data, has_more=has_more)""",
+    ("cursor", "count"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    total = await dao.count(session, **kwargs)
+    data, next_cursor = await dao.query_all_by_cursor(session, page.cursor, page.page_size, **kwargs)
+    return schema.CursorPageResult.ok(data=data, total=total, next_cursor=next_cursor)""",
+    ("cursor", "has_more"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, next_cursor = await dao.query_all_by_cursor(session, page.cursor, page.page_size, **kwargs)
+    return schema.CursorSliceResult.ok(data=data, next_cursor=next_cursor)""",
+}
+
+# MySQL 默认使用 aiomysql 驱动，也可将 DB_URI 改为 mysql+asyncmy://；
+# 提交后不使对象过期，返回响应时不会在事件循环外触发懒加载
+SQLMODEL_ASYNC_DB = """\
+import os
+from typing import Annotated, AsyncIterator
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+db_uri = os.getenv("DB_URI", "{uri}")
+
+engine = create_async_engine(
+    db_uri,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+)
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+"""
+
 
 # Tortoise ORM
 
-TORTOISE_DAO = """
+TORTOISE_DAO = """\
+from typing import {typing}
+
+import model
+import schema{imports}
+
+
 async def create(obj_in: schema.{table}) -> model.{table}:
-    obj = model.{table}(**obj_in.model_dump(exclude_unset=True))
+    data = obj_in.model_dump(exclude_unset=True)
+    obj = model.{table}(**data)
     await obj.save()
     return obj
 
+
 async def query_by_id(id: int) -> Optional[model.{table}]:
     return await model.{table}.get_or_none({pk})
 
+
 async def update(id: int, obj_in: schema.{table}) -> Optional[model.{table}]:
-    obj= await query_by_id(id)
+    obj = await query_by_id(id)
     if obj:
         for field, value in obj_in.model_dump(exclude_unset=True).items():
             setattr(obj, field, value)
         await obj.save()
     return obj
 
+
 async def delete_by_id(id: int) -> Optional[model.{table}]:
     obj = await query_by_id(id)
     if obj:
         await obj.delete()
     return obj
 
+
 async def count(**kwargs) -> int:
-    return await model.{table}.filter(**kwargs).count()
+    query = model.{table}.filter(**kwargs)
+    return await query.count()
+"""
+
+TORTOISE_DAO_OFFSET = """\
+
 
 async def query_all_by_limit(page_number: int, page_size: int, **kwargs) -> List[model.{table}]:
     offset = (page_number - 1) * page_size
     limit = page_size
-    return await model.{table}.filter(**kwargs).offset(offset).limit(limit).all()
+    query = model.{table}.filter(**kwargs)
+    return await query.offset(offset).limit(limit).all()
 """
 
-TORTOISE_ROUTER = """
-from fastapi import APIRouter, Depends
-import schema
+TORTOISE_DAO_WINDOW = """\
+
+
+async def query_all_by_limit(page_number: int, page_size: int, **kwargs) -> Tuple[List[model.{table}], int]:
+    offset = (page_number - 1) * page_size
+    limit = page_size
+    query = model.{table}.filter(**kwargs)
+    query = query.annotate(total=RawSQL("COUNT(*) OVER()"))
+    data = await query.offset(offset).limit(limit).all()
+    if not data:
+        total = await count(**kwargs) if page_number > 1 else 0
+        return [], total
+    return data, data[0].total
+"""
+
+TORTOISE_DAO_HAS_MORE = """\
+
+
+async def query_all_by_limit(page_number: int, page_size: int, **kwargs) -> Tuple[List[model.{table}], bool]:
+    offset = (page_number - 1) * page_size
+    query = model.{table}.filter(**kwargs)
+    data = await query.offset(offset).limit(page_size + 1).all()
+    return data[:page_size], len(data) > page_size
+"""
+
+TORTOISE_DAO_CURSOR = """\
+
+
+async def query_all_by_cursor(cursor: Optional[str], page_size: int, **kwargs) -> Tuple[List[model.{table}], Optional[str]]:
+    query = model.{table}.filter(**kwargs)
+    if cursor:
+        query = query.filter({key}__gt=schema.decode_cursor(cursor))
+    data = await query.order_by("{key}").limit(page_size + 1).all()
+    if len(data) <= page_size:
+        return data, None
+    data = data[:page_size]
+    return data, schema.encode_cursor(data[-1].{key})
+"""
+
+TORTOISE_ROUTER = """\
 import dao
+import schema
+from fastapi import APIRouter, Depends
 
 $router_name = APIRouter(prefix="/$table", tags=["$table"])
 
+
 @$router_name.get("/{id}", summary="通过ID查询详情")
 async def query_${router_name}_by_id(id: int) -> schema.Result[schema.$table]:
     return schema.Result.ok(await dao.query_by_id(id))
 
-@$router_name.get("", summary="分页条件查询")
-async def query_${router_name}_all_by_limit(query: schema.$table = Depends(), page: schema.PageParam = Depends()) -> schema.PageResult[schema.$table]:
-    total = await dao.count(**query.model_dump(exclude_none=True))
-    data = await dao.query_all_by_limit(**query.model_dump(exclude_none=True), page_number=page.page_number, page_size=page.page_size)
-    return schema.PageResult.ok(data=data, total=total)       
+
+$list_route
 
 
 @$router_name.post("", summary="新增数据")
 async def create_${router_name}(instance: schema.$table) -> schema.Result[schema.$table]:
-    return schema.Result.ok(await dao.create( instance))
+    return schema.Result.ok(await dao.create(instance))
 
 
 @$router_name.patch("/{id}", summary="更新数据")
@@ -223,29 +657,81 @@ async def update_${router_name}_by_id(id: int, instance: schema.$table) -> schem
 
 @$router_name.delete("/{id}", summary="删除数据")
 async def delete_${router_name}_by_id(id: int) -> schema.Result[schema.$table]:
-    return schema.Result.ok(await dao.delete_by_id( id))
+    return schema.Result.ok(await dao.delete_by_id(id))
 """
 
+TORTOISE_LIST_ROUTE = """\
+@$router_name.get("", summary="$summary")
+async def query_${router_name}_all_by_$by(query: schema.$table = Depends(), page: schema.$param = Depends()) -> schema.$result[schema.$table]:
+$body"""
 
-TORTOISE_MAIN = (
-    """
-from fastapi import FastAPI
-from starlette.middleware.cors import CORSMiddleware
-from tortoise.contrib.fastapi import register_tortoise
-
-from router import $router_name
-
+# gather：统计总数与查询分页并发执行
+TORTOISE_LIST_BODIES = {
+    ("offset", "count"): """\
+    total = await dao.count(**query.model_dump(exclude_none=True))
+    data = await dao.query_all_by_limit(**query.model_dump(exclude_none=True), page_number=page.page_number, page_size=page.page_size)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("offset", "window"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, total = await dao.query_all_by_limit(page.page_number, page.page_size, **kwargs)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("offset", "has_more"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, has_more = await dao.query_all_by_limit(page.page_number, page.page_size, **kwargs)
+    return schema.SlicePageResult.ok(data=data, has_more=has_more)""",
+    ("offset", "gather"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    count = dao.count(**kwargs)
+    rows = dao.query_all_by_limit(page.page_number, page.page_size, **kwargs)
+    total, data = await asyncio.gather(count, rows)
+    return schema.PageResult.ok(data=data, total=total)""",
+    ("cursor", "count"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    total = await dao.count(**kwargs)
+    data, next_cursor = await dao.query_all_by_cursor(page.cursor, page.page_size, **kwargs)
+    return schema.CursorPageResult.ok(data=data, total=total, next_cursor=next_cursor)""",
+    ("cursor", "has_more"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    data, next_cursor = await dao.query_all_by_cursor(page.cursor, page.page_size, **kwargs)
+    return schema.CursorSliceResult.ok(data=data, next_cursor=next_cursor)""",
+    ("cursor", "gather"): """\
+    kwargs = query.model_dump(exclude_none=True)
+    count = dao.count(**kwargs)
+    rows = dao.query_all_by_cursor(page.cursor, page.page_size, **kwargs)
+    total, (data, next_cursor) = await asyncio.gather(count, rows)
+    return schema.CursorPageResult.ok(data=data, total=total, next_cursor=next_cursor)""",
+}
 
-app = FastAPI(title="DFS - FastAPI Tortoise ORM CRUD",description='''%s''')
+TORTOISE_MAIN_IMPORTS = {
+    "import os",
+    "from urllib.parse import urlencode",
+    "from fastapi import FastAPI",
+    "from starlette.middleware.cors import CORSMiddleware",
+    "from tortoise.contrib.fastapi import register_tortoise",
+    "from router import $router_name",
+}
 
+TORTOISE_MAIN = (
+    """\
+app = FastAPI(title="DFS - FastAPI Tortoise ORM CRUD",
+              description='''%s''')
+
+# 连接池大小写入 db_url，可通过环境变量调整
+db_url = os.getenv("DB_URI", "$uri")
+pool = urlencode({
+    "minsize": os.getenv("DB_POOL_MINSIZE", "1"),
+    "maxsize": os.getenv("DB_POOL_MAXSIZE", "10"),
+    "pool_recycle": os.getenv("DB_POOL_RECYCLE", "3600"),
+})
+db_url += ("&" if "?" in db_url else "?") + pool
 
 register_tortoise(
-        app,
-        db_url="$uri",
-        modules={"models": ["model"]},
-        generate_schemas=False,
-        add_exception_handlers=True,
-    )
+    app,
+    db_url=db_url,
+    modules={"models": ["model"]},
+    generate_schemas=False,
+    add_exception_handlers=True,
+)
 
 app.add_middleware(
     CORSMiddleware,
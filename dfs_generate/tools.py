@@ -1,13 +1,36 @@
+import bisect
+import hashlib
+import importlib.util
+import json
 import os
 import re
 import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from dataclasses import asdict, dataclass
 
-import pymysql
-
 from dfs_generate.types_map import TYPES
 
 
+def lazy_import(name):
+    """延迟导入：首次访问模块属性时才真正执行导入，缩短启动时间"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# 首次连接数据库时才加载驱动
+pymysql = lazy_import("pymysql")
+
+
 def tran(t, mode) -> dict:
     """
     转换获取对应mode下的导包和类型
@@ -83,6 +106,210 @@ class MySQLConf:
     def json(self):
         return asdict(self)
 
+    @property
+    def fingerprint(self):
+        """配置指纹，用于区分连接池等按数据库隔离的资源"""
+        raw = json.dumps(self.json(), sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ColumnInfo:
+    """
+    生成代码读取的字段信息，比 information_schema 的整行字典小得多
+    :params indexes 字段所属的索引名
+    """
+
+    __slots__ = (
+        "name",
+        "data_type",
+        "nullable",
+        "key",
+        "max_length",
+        "precision",
+        "scale",
+        "default",
+        "extra",
+        "comment",
+        "indexes",
+    )
+
+    def __init__(
+        self,
+        name,
+        data_type,
+        nullable=False,
+        key="",
+        max_length=None,
+        precision=None,
+        scale=None,
+        default=None,
+        extra="",
+        comment="",
+        indexes=(),
+    ):
+        self.name = name
+        self.data_type = data_type
+        self.nullable = nullable
+        self.key = key
+        self.max_length = max_length
+        self.precision = precision
+        self.scale = scale
+        self.default = default
+        self.extra = extra
+        self.comment = comment
+        self.indexes = list(indexes)
+
+    @classmethod
+    def from_row(cls, row: dict):
+        """由 get_table_columns 等返回的字段行构建，行中的索引名记入 indexes"""
+        index = row.get("INDEX_NAME")
+        return cls(
+            row["COLUMN_NAME"],
+            row.get("DATA_TYPE"),
+            row.get("IS_NULLABLE") == "YES",
+            row.get("COLUMN_KEY") or "",
+            row.get("CHARACTER_MAXIMUM_LENGTH"),
+            row.get("NUMERIC_PRECISION"),
+            row.get("NUMERIC_SCALE"),
+            row.get("COLUMN_DEFAULT"),
+            row.get("EXTRA") or "",
+            row.get("COLUMN_COMMENT") or "",
+            () if index is None else (index,),
+        )
+
+    def astuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnInfo):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __repr__(self):
+        return f"ColumnInfo{self.astuple()!r}"
+
+
+class MySQLPool:
+    """
+    MySQL 连接池
+    :params max_size 最大连接数，超出时等待归还
+    :params idle_timeout 空闲超过该秒数的连接会被关闭
+    :params timeout 等待可用连接的最长秒数
+    """
+
+    def __init__(self, conf: MySQLConf, max_size=5, idle_timeout=300, timeout=10):
+        self.conf = conf
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle = []  # [(conn, 归还时间)]，后进先出
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _connect(self):
+        return pymysql.connect(
+            **self.conf.json(),
+            cursorclass=pymysql.cursors.DictCursor,
+            # 避免复用连接时一直停留在旧的事务快照里
+            autocommit=True,
+        )
+
+    def _evict_idle(self):
+        """移出空闲超时的连接，需持有锁调用"""
+        deadline = time.monotonic() - self.idle_timeout
+        expired = [conn for conn, used in self._idle if used < deadline]
+        if expired:
+            self._idle = [item for item in self._idle if item[1] >= deadline]
+            self._size -= len(expired)
+        return expired
+
+    def acquire(self):
+        """取出一个可用连接，复用前先 ping 检测存活"""
+        expired = []
+        with self._cond:
+            while True:
+                expired += self._evict_idle()
+                if self._idle:
+                    conn = self._idle.pop()[0]
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                if not self._cond.wait(self.timeout):
+                    raise TimeoutError("数据库连接池已耗尽")
+        for item in expired:
+            _close_quietly(item)
+
+        try:
+            if conn is None:
+                return self._connect()
+            # 连接已断开时自动重连
+            conn.ping(reconnect=True)
+            return conn
+        except Exception:
+            if conn is not None:
+                _close_quietly(conn)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn):
+        """归还连接，顺带关闭空闲超时的连接；连接池已关闭时直接关闭该连接"""
+        with self._cond:
+            expired = self._evict_idle()
+            if self._closed:
+                self._size -= 1
+                expired.append(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        for item in expired:
+            _close_quietly(item)
+
+    def close(self):
+        """关闭所有空闲连接，使用中的连接归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(conf: MySQLConf) -> MySQLPool:
+    """按配置指纹获取连接池，不存在时创建"""
+    with _pools_lock:
+        pool = _pools.get(conf.fingerprint)
+        if pool is None:
+            pool = _pools[conf.fingerprint] = MySQLPool(conf)
+        return pool
+
+
+def close_pools(keep: MySQLConf = None):
+    """关闭并移除连接池，keep 对应的连接池保留；切换连接配置后旧配置的连接不会再被使用"""
+    with _pools_lock:
+        closing = [
+            _pools.pop(key)
+            for key in list(_pools)
+            if keep is None or key != keep.fingerprint
+        ]
+    for pool in closing:
+        pool.close()
+
 
 class MySQLHelper:
     """引用 https://github.com/tortoise/aerich/blob/dev/aerich/inspectdb/mysql.py"""
@@ -90,24 +317,82 @@ class MySQLHelper:
     GET_TABLES = (
         "select TABLE_NAME from information_schema.TABLES where TABLE_SCHEMA=%s"
     )
-    GET_TABLE_COLUMNS = """select c.*, s.NON_UNIQUE, s.INDEX_NAME
+    # 只查询生成代码用到的列，不使用 c.*
+    GET_TABLE_COLUMNS = """select c.COLUMN_NAME, c.ORDINAL_POSITION, c.DATA_TYPE,
+       c.IS_NULLABLE, c.COLUMN_KEY, c.CHARACTER_MAXIMUM_LENGTH, c.NUMERIC_PRECISION,
+       c.NUMERIC_SCALE, c.COLUMN_DEFAULT, c.EXTRA, c.COLUMN_COMMENT,
+       s.NON_UNIQUE, s.INDEX_NAME
 from information_schema.COLUMNS c
          left join information_schema.STATISTICS s on c.TABLE_NAME = s.TABLE_NAME
     and c.TABLE_SCHEMA = s.TABLE_SCHEMA
     and c.COLUMN_NAME = s.COLUMN_NAME
 where c.TABLE_SCHEMA = %s
   and c.TABLE_NAME = %s"""
-
-    def __init__(self, conf: MySQLConf):
+    # 整库批量读取：固定两次查询，不随表数量增长
+    GET_SCHEMA_COLUMNS = """select TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, DATA_TYPE,
+       IS_NULLABLE, COLUMN_KEY, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION,
+       NUMERIC_SCALE, COLUMN_DEFAULT, EXTRA, COLUMN_COMMENT
+from information_schema.COLUMNS
+where TABLE_SCHEMA = %s"""
+    GET_SCHEMA_STATISTICS = """select TABLE_NAME, COLUMN_NAME, NON_UNIQUE, INDEX_NAME
+from information_schema.STATISTICS
+where TABLE_SCHEMA = %s"""
+    # 表结构指纹：字段、索引校验和与建表时间，任一变化即视为表结构变更
+    GET_TABLE_FINGERPRINT = """select
+    (select concat(count(*), ':', coalesce(sum(crc32(concat_ws('|', COLUMN_NAME,
+        ORDINAL_POSITION, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY,
+        coalesce(COLUMN_DEFAULT, 'NULL'), EXTRA, COLUMN_COMMENT))), 0))
+     from information_schema.COLUMNS
+     where TABLE_SCHEMA = %s and TABLE_NAME = %s) as COLUMNS_CHECKSUM,
+    (select concat(count(*), ':', coalesce(sum(crc32(concat_ws('|', INDEX_NAME,
+        COLUMN_NAME, NON_UNIQUE, SEQ_IN_INDEX))), 0))
+     from information_schema.STATISTICS
+     where TABLE_SCHEMA = %s and TABLE_NAME = %s) as STATISTICS_CHECKSUM,
+    (select CREATE_TIME
+     from information_schema.TABLES
+     where TABLE_SCHEMA = %s and TABLE_NAME = %s) as CREATE_TIME"""
+    # 整库各表结构指纹，一次聚合查询，结果与 get_table_fingerprint 逐表查询一致
+    GET_SCHEMA_TABLE_FINGERPRINTS = """select t.TABLE_NAME,
+    coalesce(c.COLUMNS_CHECKSUM, '0:0') as COLUMNS_CHECKSUM,
+    coalesce(s.STATISTICS_CHECKSUM, '0:0') as STATISTICS_CHECKSUM,
+    t.CREATE_TIME
+from information_schema.TABLES t
+         left join (select TABLE_NAME, concat(count(*), ':', sum(crc32(concat_ws('|',
+        COLUMN_NAME, ORDINAL_POSITION, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY,
+        coalesce(COLUMN_DEFAULT, 'NULL'), EXTRA, COLUMN_COMMENT)))) as COLUMNS_CHECKSUM
+                    from information_schema.COLUMNS
+                    where TABLE_SCHEMA = %s
+                    group by TABLE_NAME) c on c.TABLE_NAME = t.TABLE_NAME
+         left join (select TABLE_NAME, concat(count(*), ':', sum(crc32(concat_ws('|',
+        INDEX_NAME, COLUMN_NAME, NON_UNIQUE, SEQ_IN_INDEX)))) as STATISTICS_CHECKSUM
+                    from information_schema.STATISTICS
+                    where TABLE_SCHEMA = %s
+                    group by TABLE_NAME) s on s.TABLE_NAME = t.TABLE_NAME
+where t.TABLE_SCHEMA = %s"""
+    # 库级表名指纹：表数量、表名校验和与最近建表时间，增删改名表时变化
+    GET_SCHEMA_FINGERPRINT = """select concat(count(*), ':',
+    coalesce(sum(crc32(TABLE_NAME)), 0), ':',
+    coalesce(max(CREATE_TIME), '')) as TABLES_CHECKSUM
+from information_schema.TABLES
+where TABLE_SCHEMA = %s"""
+
+    def __init__(self, conf: MySQLConf, pool: MySQLPool = None):
         self.conf = conf
-        self.conn = pymysql.connect(
-            **self.conf.json(), cursorclass=pymysql.cursors.DictCursor
-        )
+        self.pool = pool
+        if pool is not None:
+            self.conn = pool.acquire()
+        else:
+            self.conn = pymysql.connect(
+                **self.conf.json(), cursorclass=pymysql.cursors.DictCursor
+            )
         self.cursor = self.conn.cursor()
 
     def close(self):
         self.cursor.close()
-        self.conn.close()
+        if self.pool is not None:
+            self.pool.release(self.conn)
+        else:
+            self.conn.close()
 
     def get_tables(self):
         """获取所有表"""
@@ -121,6 +406,68 @@ where c.TABLE_SCHEMA = %s
         rows = self.cursor.fetchall()
         return sorted(rows, key=lambda x: x["ORDINAL_POSITION"])
 
+    def get_table_fingerprint(self, table_name):
+        """获取表结构指纹，比 get_table_columns 的关联查询轻量得多"""
+        self.cursor.execute(self.GET_TABLE_FINGERPRINT, [self.conf.db, table_name] * 3)
+        row = self.cursor.fetchone()
+        return "|".join(
+            str(row[key])
+            for key in ("COLUMNS_CHECKSUM", "STATISTICS_CHECKSUM", "CREATE_TIME")
+        )
+
+    def get_schema_fingerprints(self):
+        """一次查询获取整库各表的结构指纹 {表名: 指纹}"""
+        self.cursor.execute(self.GET_SCHEMA_TABLE_FINGERPRINTS, [self.conf.db] * 3)
+        return {
+            row["TABLE_NAME"]: "|".join(
+                str(row[key])
+                for key in ("COLUMNS_CHECKSUM", "STATISTICS_CHECKSUM", "CREATE_TIME")
+            )
+            for row in self.cursor.fetchall()
+        }
+
+    def get_schema_fingerprint(self):
+        """获取库内表名指纹，用于判断表名索引是否需要重建"""
+        self.cursor.execute(self.GET_SCHEMA_FINGERPRINT, [self.conf.db])
+        return str(self.cursor.fetchone()["TABLES_CHECKSUM"])
+
+    def _fetch_schema(self, sql, tables):
+        params = [self.conf.db]
+        if tables is not None:
+            sql += " and TABLE_NAME in %s"
+            params.append(tuple(tables))
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchall()
+
+    def get_schema_columns(self, tables=None):
+        """
+        批量获取整库(或指定表)的字段，按表分组
+        返回的每张表的行与 get_table_columns 结构一致（字段每属于一个索引占一行）
+        :params tables 表名列表，None 表示整库
+        """
+        if tables is not None:
+            tables = list(tables)
+            if not tables:
+                return {}
+        columns = self._fetch_schema(self.GET_SCHEMA_COLUMNS, tables)
+        statistics = defaultdict(list)
+        for row in self._fetch_schema(self.GET_SCHEMA_STATISTICS, tables):
+            statistics[(row["TABLE_NAME"], row["COLUMN_NAME"])].append(row)
+
+        result = defaultdict(list)
+        for column in sorted(columns, key=lambda x: x["ORDINAL_POSITION"]):
+            key = (column["TABLE_NAME"], column["COLUMN_NAME"])
+            no_index = {"NON_UNIQUE": None, "INDEX_NAME": None}
+            for index in statistics.get(key) or [no_index]:
+                result[column["TABLE_NAME"]].append(
+                    {
+                        **column,
+                        "NON_UNIQUE": index["NON_UNIQUE"],
+                        "INDEX_NAME": index["INDEX_NAME"],
+                    }
+                )
+        return dict(result)
+
     def __enter__(self):
         return self
 
@@ -128,6 +475,116 @@ where c.TABLE_SCHEMA = %s
         self.close()
 
 
+class MetadataCache:
+    """
+    表字段元数据缓存
+    每次读取先查询表结构指纹，指纹不变时直接返回缓存的字段，跳过关联查询
+    :params max_size 最多缓存的表数量，超出时淘汰最久未使用的
+    """
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._data = OrderedDict()  # (配置指纹, 表名) -> (表结构指纹, 字段)
+        self._lock = threading.Lock()
+
+    def get_table_columns(self, helper: MySQLHelper, table_name):
+        """同 MySQLHelper.get_table_columns，返回的字段请勿修改"""
+        key = (helper.conf.fingerprint, table_name)
+        fingerprint = helper.get_table_fingerprint(table_name)
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._data.move_to_end(key)
+                return cached[1]
+
+        rows = helper.get_table_columns(table_name)
+        with self._lock:
+            self._data[key] = (fingerprint, rows)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TableIndex:
+    """
+    表名索引：按小写表名排序的数组，前缀匹配用二分查找定位，子串匹配顺序扫描
+    """
+
+    def __init__(self, names):
+        pairs = sorted((name.lower(), name) for name in names)
+        self.keys = [key for key, _ in pairs]
+        self.names = [name for _, name in pairs]
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix(self, keyword, ignore_case):
+        lower = keyword.lower()
+        start = bisect.bisect_left(self.keys, lower)
+        end = bisect.bisect_right(self.keys, lower + chr(0x10FFFF), lo=start)
+        names = self.names[start:end]
+        if ignore_case:
+            return names
+        return [name for name in names if name.startswith(keyword)]
+
+    def _substring(self, keyword, ignore_case):
+        if ignore_case:
+            lower = keyword.lower()
+            return [name for key, name in zip(self.keys, self.names) if lower in key]
+        return [name for name in self.names if keyword in name]
+
+    def search(
+        self, keyword="", match="substring", ignore_case=False, offset=0, limit=None
+    ):
+        """
+        查询表名，结果按名称排序
+        :params match 匹配方式 prefix 前缀 / substring 子串
+        :params ignore_case 是否忽略大小写
+        :params offset limit 分页，limit 为 None 时返回全部
+        :return (匹配总数, 当前页表名)
+        """
+        if not keyword:
+            matched = self.names
+        elif match == "prefix":
+            matched = self._prefix(keyword, ignore_case)
+        else:
+            matched = self._substring(keyword, ignore_case)
+        end = None if limit is None else offset + limit
+        return len(matched), matched[offset:end]
+
+
+class TableIndexCache:
+    """
+    按数据库缓存表名索引，每次读取先查询库级表名指纹，变化时重建
+    """
+
+    def __init__(self):
+        self._data = {}  # 配置指纹 -> (表名指纹, 索引)
+        self._lock = threading.Lock()
+
+    def get_index(self, helper: MySQLHelper) -> TableIndex:
+        key = helper.conf.fingerprint
+        fingerprint = helper.get_schema_fingerprint()
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+
+        index = TableIndex(helper.get_tables())
+        with self._lock:
+            self._data[key] = (fingerprint, index)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
 def get_cache_directory():
     """
     获取适用于不同操作系统的缓存目录路径。
@@ -143,6 +600,10 @@ def get_cache_directory():
 
 class Cache:
     system = os.name
+    # 生成代码缓存上限，超出后按最近访问时间淘汰
+    code_max_entries = 2000
+    code_max_bytes = 64 * 1024 * 1024
+    conf_keys = ("user", "password", "host", "port", "db", "charset")
 
     def __init__(self):
         if self.system == "posix":  # Linux, macOS, Unix
@@ -151,12 +612,17 @@ class Cache:
             cache_dir = os.path.expandvars(r"%LOCALAPPDATA%")
         else:
             cache_dir = "."
-        app_cache = os.path.join(cache_dir, "dfs-generate")
-        if not os.path.isdir(app_cache):
-            os.mkdir(app_cache)
-        self.db_path = os.path.join(app_cache, ".data.db")
-
-    def start(self):
+        self.app_cache = os.path.join(cache_dir, "dfs-generate")
+        self.db_path = os.path.join(self.app_cache, ".data.db")
+        # 单个长连接，首次使用时打开，读写都在锁内进行
+        self._conn = None
+        self._lock = threading.Lock()
+        self._conf = None
+
+    def _open(self):
+        """打开数据库并建表，已打开时直接返回连接，调用方需持有锁"""
+        if self._conn is not None:
+            return self._conn
         create_table_sql = """
             CREATE TABLE IF NOT EXISTS conf (
                 id INTEGER PRIMARY KEY,
@@ -168,29 +634,102 @@ class Cache:
                 charset TEXT NOT NULL
             );
         """
-        with sqlite3.connect(self.db_path, check_same_thread=False) as conn:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
+        create_code_table_sql = """
+            CREATE TABLE IF NOT EXISTS codegen (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INT NOT NULL,
+                accessed REAL NOT NULL
+            );
+        """
+        create_code_index_sql = """
+            CREATE INDEX IF NOT EXISTS idx_codegen_accessed ON codegen (accessed);
+        """
+        query_sql = """
+            SELECT id, user, password, host, port, db, charset FROM conf ORDER BY id DESC LIMIT 1
+        """
+        os.makedirs(self.app_cache, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(create_table_sql)
+            self._conn.execute(create_code_table_sql)
+            self._conn.execute(create_code_index_sql)
+            result = self._conn.execute(query_sql).fetchone()
+            if result:
+                # 旧版本每次配置都追加一行，只保留最新的一条
+                self._conn.execute("DELETE FROM conf WHERE id <> ?", (result[0],))
+                self._conn.execute("UPDATE conf SET id = 1")
+                self._conf = dict(zip(self.conf_keys, result[1:]))
+        return self._conn
+
+    def start(self):
+        """打开数据库，不调用时在首次读写时自动打开"""
+        with self._lock:
+            self._open()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def set(self, user, password, host, port, db, charset):
-        with sqlite3.connect(self.db_path, check_same_thread=False) as conn:
-            cursor = conn.cursor()
-            insert_sql = """
-                INSERT INTO conf (user, password, host, port, db, charset) VALUES (?, ?, ?, ?, ?, ?)
-            """
-            cursor.execute(insert_sql, (user, password, host, port, db, charset))
-            conn.commit()
+        upsert_sql = """
+            INSERT INTO conf (id, user, password, host, port, db, charset) VALUES (1, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                user = excluded.user,
+                password = excluded.password,
+                host = excluded.host,
+                port = excluded.port,
+                db = excluded.db,
+                charset = excluded.charset
+        """
+        values = (user, password, host, port, db, charset)
+        with self._lock, self._open():
+            self._conn.execute(upsert_sql, values)
+            self._conf = dict(zip(self.conf_keys, values))
 
     def get(self):
-        with sqlite3.connect(self.db_path, check_same_thread=False) as conn:
-            cursor = conn.cursor()
-            query_sql = """
-                SELECT user, password, host, port, db, charset FROM conf ORDER BY id DESC LIMIT 1
-            """
-            cursor.execute(query_sql)
+        """当前配置，打开后直接读取内存中的副本"""
+        if self._conn is None:
+            self.start()
+        conf = self._conf
+        return dict(conf) if conf else None
+
+    def get_code(self, key):
+        """按键读取已生成的代码，未命中返回 None"""
+        with self._lock, self._open():
+            cursor = self._conn.execute(
+                "SELECT data FROM codegen WHERE key = ?", (key,)
+            )
             result = cursor.fetchone()
-            if result:
-                keys = ["user", "password", "host", "port", "db", "charset"]
-                return dict(zip(keys, result))
-            return None
+            if result is None:
+                return None
+            self._conn.execute(
+                "UPDATE codegen SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(result[0])
+
+    def set_code(self, key, code):
+        """保存生成的代码，并淘汰超出数量或体积上限的旧数据"""
+        data = json.dumps(code, ensure_ascii=False)
+        with self._lock, self._open():
+            cursor = self._conn.cursor()
+            insert_sql = """
+                INSERT OR REPLACE INTO codegen (key, data, size, accessed) VALUES (?, ?, ?, ?)
+            """
+            cursor.execute(insert_sql, (key, data, len(data), time.time()))
+            evict_sql = """
+                DELETE FROM codegen WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key,
+                               ROW_NUMBER() OVER w AS n,
+                               SUM(size) OVER w AS total
+                        FROM codegen
+                        WINDOW w AS (ORDER BY accessed DESC, rowid DESC)
+                    ) WHERE n > ? OR total > ?
+                )
+            """
+            cursor.execute(evict_sql, (self.code_max_entries, self.code_max_bytes))
@@ -0,0 +1,68 @@
+"""
+表结构监听：定时轮询整库表结构指纹，只为结构变化的表重新生成代码
+"""
+
+import fnmatch
+import logging
+import threading
+
+from dfs_generate.tools import MySQLConf, MySQLHelper, get_pool
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaWatcher:
+    """
+    每次轮询只执行一次整库聚合查询，与上次的各表指纹对比找出变化的表
+    :params conf 数据库配置
+    :params on_change 回调 on_change(helper, tables)，tables 为结构变化或新增的表；
+        回调成功后才记录新的指纹，失败时下次轮询重试
+    :params interval 轮询间隔秒数
+    :params tables 只关注匹配的表，支持通配符，默认全部
+    """
+
+    def __init__(self, conf: MySQLConf, on_change, interval=5.0, tables=None):
+        self.conf = conf
+        self.on_change = on_change
+        self.interval = interval
+        self.tables = list(tables or [])
+        self.fingerprints = {}
+
+    def _selected(self, fingerprints):
+        if not self.tables:
+            return fingerprints
+        return {
+            table: fingerprint
+            for table, fingerprint in fingerprints.items()
+            if any(fnmatch.fnmatchcase(table, pattern) for pattern in self.tables)
+        }
+
+    def poll(self, helper: MySQLHelper, notify=True):
+        """
+        轮询一次，返回变化的表
+        :params notify 为 False 时只记录指纹作为基线，不触发回调
+        """
+        current = self._selected(helper.get_schema_fingerprints())
+        changed = sorted(
+            table
+            for table, fingerprint in current.items()
+            if self.fingerprints.get(table) != fingerprint
+        )
+        if changed and notify:
+            self.on_change(helper, changed)
+        self.fingerprints = current
+        return changed
+
+    def tick(self, notify=True):
+        with MySQLHelper(self.conf, pool=get_pool(self.conf)) as helper:
+            return self.poll(helper, notify)
+
+    def run(self, stop: threading.Event = None):
+        """持续轮询直到 stop 被设置，单次失败不会中断监听"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("表结构轮询失败")
+            stop.wait(self.interval)
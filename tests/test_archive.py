@@ -0,0 +1,145 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from dfs_generate import server
+from dfs_generate.archive import ERROR_FILE, stream_zip
+from dfs_generate.conversion import TortoiseConversion
+from tests.test_conversion import MOCK_COLUMNS, MOCK_TABLE_NAME, MOCK_URI
+from tests.test_metrics import _call
+
+
+def test_stream_zip():
+    produced = []
+
+    def bundles():
+        for table in ("users", "orders"):
+            produced.append(table)
+            yield table, {"model.py": f"# {table}\n", "api.ts": "export {}\n"}
+
+    chunks = stream_zip(bundles())
+    # 第一张表写入后即输出数据，无需等待全部生成
+    first = next(chunks)
+    assert first and produced == ["users"]
+    data = first + b"".join(chunks)
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == [
+            "users/model.py",
+            "users/api.ts",
+            "orders/model.py",
+            "orders/api.ts",
+        ]
+        assert archive.read("orders/model.py") == b"# orders\n"
+
+
+def test_stream_zip_empty():
+    data = b"".join(stream_zip([]))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == []
+
+
+def test_stream_zip_error():
+    def bundles():
+        yield "users", {"model.py": "# users\n"}
+        raise RuntimeError("boom")
+
+    data = b"".join(stream_zip(bundles()))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == ["users/model.py", ERROR_FILE]
+        assert "boom" in archive.read(ERROR_FILE).decode("utf-8")
+
+
+class _Helper:
+    """批量查询字段，记录调用与连接是否已归还"""
+
+    def __init__(self):
+        self.calls = []
+        self.released = False
+
+    def get_tables(self):
+        return ["users", "orders"]
+
+    def get_schema_columns(self, tables=None):
+        self.calls.append(tables)
+        return {table: MOCK_COLUMNS for table in tables}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.released = True
+
+
+@pytest.fixture
+def helper(monkeypatch):
+    helper = _Helper()
+    conf = {"host": "127.0.0.1", "user": "root", "password": "123456", "db": "demo"}
+    monkeypatch.setattr(server.cache, "get", lambda: conf)
+    monkeypatch.setattr(server, "_mysql", lambda conf=None: helper)
+    return helper
+
+
+def test_download(helper, monkeypatch):
+    def gencode(conversion, files=None, store=True):
+        # 字段已按批取出，生成时不再占用连接；批量导出不写入代码缓存
+        assert helper.released
+        assert not store
+        return [{"name": "model.py", "code": conversion.table, "key": "model.py"}]
+
+    monkeypatch.setattr(server, "_gencode", gencode)
+    status, headers, body = _call("/download", "tables=orders,users&mode=tortoise")
+    assert status.startswith("200")
+    assert headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["orders/model.py", "users/model.py"]
+        assert archive.read("users/model.py") == b"Users"
+    assert helper.calls == [["orders", "users"]]
+
+    # 整库导出按批查询字段
+    monkeypatch.setattr(server, "DOWNLOAD_BATCH_SIZE", 1)
+    _, _, body = _call("/download")
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["orders/model.py", "users/model.py"]
+    assert helper.calls[1:] == [["orders"], ["users"]]
+
+    # 表不存在时在输出 ZIP 之前返回错误
+    _, headers, body = _call("/download", "tables=users,missing")
+    assert headers["Content-Type"].startswith("application/json")
+    assert json.loads(body)["code"] == 40000
+
+
+def test_download_cursor_fallback(helper, monkeypatch):
+    logs = [{**MOCK_COLUMNS[0], "COLUMN_KEY": ""}, MOCK_COLUMNS[1]]
+    schema = {"logs": logs, "users": MOCK_COLUMNS}
+    monkeypatch.setattr(helper, "get_tables", lambda: list(schema))
+    monkeypatch.setattr(helper, "get_schema_columns", lambda tables: dict(schema))
+
+    def gencode(conversion, files=None, store=True):
+        return [{"name": "p.txt", "code": conversion.pagination, "key": "p.txt"}]
+
+    monkeypatch.setattr(server, "_gencode", gencode)
+    # 没有游标字段的表改用 offset 分页，不中断导出
+    _, _, body = _call("/download", "mode=tortoise&pagination=cursor")
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["logs/p.txt", "users/p.txt"]
+        assert archive.read("logs/p.txt") == b"offset"
+        assert archive.read("users/p.txt") == b"cursor"
+
+    # 不合法的选项组合在输出 ZIP 之前返回错误
+    _, headers, body = _call("/download", "pagination=cursor&listStrategy=window")
+    assert json.loads(body)["code"] == 40000
+
+
+def test_gencode_store(monkeypatch):
+    stored = []
+    monkeypatch.setattr(server.cache, "get_code", lambda key: None)
+    monkeypatch.setattr(server.cache, "set_code", lambda key, data: stored.append(key))
+    conversion = TortoiseConversion(MOCK_TABLE_NAME, MOCK_COLUMNS, MOCK_URI, True)
+    names = [item["name"] for item in server._gencode(conversion, store=False)]
+    assert names == list(conversion.files)
+    assert stored == []
+    server._gencode(conversion)
+    assert stored == [conversion.fingerprint]
@@ -0,0 +1,63 @@
+import gzip
+import io
+import os
+
+import bottle
+
+from dfs_generate.assets import IMMUTABLE, REVALIDATE, AssetStore
+
+SCRIPT = b"console.log('dfs-generate');\n" * 200
+
+
+def _request(**headers):
+    environ = {"REQUEST_METHOD": "GET", "wsgi.input": io.BytesIO()}
+    for name, value in headers.items():
+        environ["HTTP_" + name.upper()] = value
+    bottle.request.bind(environ)
+    bottle.response.bind()
+
+
+def _dist(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<html>dfs</html>")
+    (tmp_path / "assets" / "index-4ed993c7.js").write_bytes(SCRIPT)
+    return tmp_path
+
+
+def test_serve_assets(tmp_path):
+    store = AssetStore(str(_dist(tmp_path)))
+
+    _request(accept_encoding="gzip")
+    body = store.serve("assets/index-4ed993c7.js")
+    response = bottle.response
+    assert gzip.decompress(body) == SCRIPT
+    assert response.get_header("Content-Encoding") == "gzip"
+    assert response.get_header("Cache-Control") == IMMUTABLE
+    assert "javascript" in response.content_type
+    etag = response.get_header("ETag")
+
+    _request(accept_encoding="gzip", if_none_match=etag)
+    assert store.serve("assets/index-4ed993c7.js") == b""
+    assert bottle.response.status_code == 304
+    assert bottle.response.get_header("ETag") == etag
+
+    # 小文件不压缩，未带哈希的文件每次验证
+    _request(accept_encoding="gzip")
+    assert store.serve("index.html") == b"<html>dfs</html>"
+    assert bottle.response.get_header("Content-Encoding") is None
+    assert bottle.response.get_header("Cache-Control") == REVALIDATE
+
+    _request()
+    assert store.serve("assets/index-4ed993c7.js") == SCRIPT
+    assert store.serve("../index.html").status_code == 404
+
+
+def test_reload_on_change(tmp_path):
+    store = AssetStore(str(_dist(tmp_path)), interval=0)
+    first = store.get("index.html")
+    assert store.get("index.html") is first
+
+    path = tmp_path / "index.html"
+    path.write_bytes(b"<html>changed</html>")
+    os.utime(path, ns=(1, 1))
+    assert store.get("index.html").body == b"<html>changed</html>"
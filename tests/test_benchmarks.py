@@ -0,0 +1,32 @@
+from benchmarks.run import compare, measure
+from benchmarks.schema import make_schema, make_table
+from dfs_generate.conversion import SQLModelConversion
+from tests.test_conversion import MOCK_COLUMNS, MOCK_URI
+
+
+def test_make_table():
+    rows = make_table(50, seed=1, index_ratio=1.0, indexes_per_column=3)
+    names = [row["COLUMN_NAME"] for row in rows]
+    # 字段每属于一个索引占一行
+    assert len(set(names)) == 50 and len(rows) > 50
+    assert rows[0]["COLUMN_KEY"] == "PRI"
+    assert set(MOCK_COLUMNS[0]) <= set(rows[0])
+    assert make_table(50, seed=1) == make_table(50, seed=1)
+    assert SQLModelConversion("bench", rows, MOCK_URI).gencode()
+
+
+def test_make_schema():
+    tables = list(make_schema(20, min_columns=5, max_columns=8))
+    assert len(tables) == 20
+    assert all(5 <= len({r["COLUMN_NAME"] for r in rows}) <= 8 for _, rows in tables)
+
+
+def test_compare():
+    baseline = {"a": 1.0, "b": 1.0}
+    results = {"a": 1.3, "b": 1.1, "c": 5.0}
+    assert compare(results, baseline, 20) == [("a", 1.0, 1.3)]
+    assert compare(results, baseline, 50) == []
+
+
+def test_measure():
+    assert measure(lambda: None, repeat=2, min_time=0.001) > 0
@@ -0,0 +1,143 @@
+import io
+import os
+
+import pytest
+
+from dfs_generate.cli import MANIFEST, generate, load_manifest, main
+from dfs_generate.ddl import iter_dump
+from tests.test_ddl import DUMP
+
+URI = "mysql+pymysql://u:p@h/demo"
+
+
+def _sources(dump=DUMP):
+    return iter_dump(io.StringIO(dump))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_incremental(tmp_path, workers):
+    out = str(tmp_path)
+    stats = generate(_sources(), "sqlmodel", out, URI, workers=workers)
+    assert stats["generated"] == 2
+    assert os.path.isfile(tmp_path / "users" / "model.py")
+    assert set(load_manifest(out)["tables"]) == {"users", "orgs"}
+
+    # 表结构未变化时全部跳过
+    stats = generate(_sources(), "sqlmodel", out, URI, workers=workers)
+    assert (stats["generated"], stats["skipped"], stats["written"]) == (0, 2, 0)
+
+    # 只重新生成变化的表，只改写内容变化的文件
+    changed = DUMP.replace("`name` char(10)", "`name` char(20)")
+    stats = generate(_sources(changed), "sqlmodel", out, URI, workers=workers)
+    assert (stats["generated"], stats["skipped"]) == (1, 1)
+    assert 0 < stats["written"] < 10
+    assert "max_length=20" in (tmp_path / "orgs" / "model.py").read_text("utf-8")
+
+
+def test_generate_missing_file(tmp_path):
+    out = str(tmp_path)
+    generate(_sources(), "tortoise", out, URI, workers=1)
+    os.remove(tmp_path / "orgs" / "dao.py")
+    stats = generate(_sources(), "tortoise", out, URI, workers=1)
+    assert (stats["generated"], stats["written"]) == (1, 1)
+    assert os.path.isfile(tmp_path / "orgs" / "dao.py")
+
+    stats = generate(_sources(), "tortoise", out, URI, workers=1, force=True)
+    assert (stats["generated"], stats["written"]) == (2, 18)
+
+
+def test_main_dump(tmp_path, capsys):
+    dump = tmp_path / "schema.sql"
+    dump.write_text(DUMP, encoding="utf-8")
+    out = tmp_path / "out"
+    argv = ["--dump", str(dump), "-o", str(out), "-t", "org*", "-j", "1"]
+    stats = main(argv)
+    assert stats["tables"] == 1
+    assert os.path.isfile(out / MANIFEST)
+    assert os.listdir(out / "orgs")
+    assert "共 1 张表" in capsys.readouterr().out
+
+
+def test_main_dump_uri(tmp_path, monkeypatch):
+    dump = tmp_path / "schema.sql"
+    dump.write_text(DUMP, encoding="utf-8")
+    out = tmp_path / "out"
+    monkeypatch.setenv("DB_URI", "mysql+pymysql://app:secret@db:3306/demo")
+    main(["--dump", str(dump), "-o", str(out), "-t", "org*", "-j", "1"])
+    # 离线生成的连接地址取自环境变量，不写入默认账号密码
+    db = (out / "orgs" / "db.py").read_text("utf-8")
+    assert "app:secret@db:3306" in db
+    assert "123456" not in db
+
+
+def test_main_pagination(tmp_path):
+    dump = tmp_path / "schema.sql"
+    dump.write_text(DUMP, encoding="utf-8")
+    out = tmp_path / "out"
+    argv = ["--dump", str(dump), "-o", str(out), "-t", "org*", "-j", "1"]
+    main(argv)
+    assert "query_all_by_limit" in (out / "orgs" / "dao.py").read_text("utf-8")
+
+    stats = main(argv + ["--pagination", "cursor"])
+    # 分页方式计入指纹，切换后重新生成
+    assert stats["generated"] == 1
+    assert "query_all_by_cursor" in (out / "orgs" / "dao.py").read_text("utf-8")
+
+
+def test_main_table_rules(tmp_path):
+    dump = tmp_path / "schema.sql"
+    dump.write_text(DUMP, encoding="utf-8")
+    out = tmp_path / "out"
+    argv = ["--dump", str(dump), "-o", str(out), "-j", "1", "-m", "tortoise"]
+    main(argv + ["--list-strategy", "gather", "--list-strategy", "org*=has_more"])
+    assert "asyncio.gather" not in (out / "orgs" / "router.py").read_text("utf-8")
+    assert "SlicePageResult" in (out / "orgs" / "router.py").read_text("utf-8")
+    others = [name for name in os.listdir(out) if name not in ("orgs", MANIFEST)]
+    assert others
+    for name in others:
+        assert "asyncio.gather" in (out / name / "router.py").read_text("utf-8")
+
+    with pytest.raises(SystemExit):
+        main(argv + ["--list-strategy", "org*=unknown"])
+
+
+def test_main_cursor_fallback(tmp_path, capsys):
+    dump = tmp_path / "schema.sql"
+    dump.write_text(DUMP + "CREATE TABLE `log` (`msg` text);\n", encoding="utf-8")
+    out = tmp_path / "out"
+    argv = ["--dump", str(dump), "-o", str(out), "-j", "1", "--pagination", "cursor"]
+    stats = main(argv)
+    # 没有游标字段的表改用 offset 分页，其余表不受影响
+    assert (stats["tables"], stats["generated"]) == (3, 3)
+    assert "query_all_by_limit" in (out / "log" / "dao.py").read_text("utf-8")
+    assert "query_all_by_cursor" in (out / "orgs" / "dao.py").read_text("utf-8")
+    assert "log 没有单列主键" in capsys.readouterr().err
+    assert os.path.isfile(out / MANIFEST)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--list-strategy", "gather"],
+        ["--list-strategy", "org*=gather"],
+        ["--pagination", "cursor", "--list-strategy", "window"],
+        ["--pagination", "cursor", "--list-strategy", "org*=window"],
+    ],
+)
+def test_main_invalid_options(tmp_path, capsys, options):
+    out = tmp_path / "out"
+    with pytest.raises(SystemExit):
+        main(["--dump", "missing.sql", "-o", str(out), "-m", "sqlmodel", *options])
+    # 开始生成前即退出
+    assert not os.path.exists(out)
+    assert "error:" in capsys.readouterr().err
+
+
+def test_main_rules_override(tmp_path):
+    dump = tmp_path / "schema.sql"
+    dump.write_text(DUMP, encoding="utf-8")
+    out = tmp_path / "out"
+    argv = ["--dump", str(dump), "-o", str(out), "-j", "1", "--list-strategy", "window"]
+    # 后出现的规则覆盖了 org* 的 window，可以与游标分页同时使用
+    rules = ["--list-strategy", "org*=count", "--pagination", "org*=cursor"]
+    assert main(argv + rules)["generated"] == 2
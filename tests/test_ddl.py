@@ -0,0 +1,140 @@
+import io
+
+from dfs_generate.conversion import SQLModelConversion, TortoiseConversion
+from dfs_generate.ddl import iter_dump, iter_statements, parse_create_table
+
+DUMP = """\
+-- MySQL dump 10.13  Distrib 8.0.36, for Linux (x86_64)
+--
+-- Host: localhost    Database: demo
+/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
+/*!40101 SET NAMES utf8mb4 */;
+
+--
+-- Table structure for table `users`
+--
+
+DROP TABLE IF EXISTS `users`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `users` (
+  `id` bigint unsigned NOT NULL AUTO_INCREMENT COMMENT '主键',
+  `name` varchar(100) COLLATE utf8mb4_general_ci DEFAULT NULL COMMENT '姓名; 含分号',
+  `email` varchar(255) NOT NULL,
+  `status` tinyint(1) NOT NULL DEFAULT '1',
+  `balance` decimal(12,2) DEFAULT '0.00',
+  `profile` json DEFAULT NULL,
+  `note` text,
+  `kind` enum('a','bb','ccc') DEFAULT 'a',
+  `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'it''s',
+  `org_id` int DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_email` (`email`),
+  KEY `idx_org_status` (`org_id`,`status`),
+  KEY `idx_status` (`status`),
+  CONSTRAINT `fk_org` FOREIGN KEY (`org_id`) REFERENCES `orgs` (`id`)
+) ENGINE=InnoDB AUTO_INCREMENT=3 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='用户';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+DROP TABLE IF EXISTS `orgs`;
+CREATE TABLE `orgs` (
+  `id` int NOT NULL,
+  `name` char(10) DEFAULT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB;
+/*!50001 CREATE VIEW `v` AS SELECT 1 AS `a`*/;
+"""
+
+
+def _columns(rows):
+    return {row["COLUMN_NAME"]: row for row in rows}
+
+
+def test_iter_statements():
+    sql = """-- 注释
+SELECT ';' AS a; # 行尾注释
+/* 多行
+   注释; */ SELECT "b;" ;
+DELIMITER ;;
+CREATE TRIGGER t BEFORE INSERT ON x FOR EACH ROW BEGIN SET @a = 1; END ;;
+DELIMITER ;
+SELECT 'it''s'
+"""
+    assert list(iter_statements(io.StringIO(sql))) == [
+        "SELECT ';' AS a",
+        'SELECT "b;"',
+        "CREATE TRIGGER t BEFORE INSERT ON x FOR EACH ROW BEGIN SET @a = 1; END",
+        "SELECT 'it''s'",
+    ]
+
+
+def test_iter_dump():
+    tables = list(iter_dump(io.StringIO(DUMP)))
+    assert [name for name, _ in tables] == ["users", "orgs"]
+    assert [name for name, _ in iter_dump(io.StringIO(DUMP), ["orgs"])] == ["orgs"]
+
+    rows = tables[0][1]
+    columns = _columns(rows)
+    assert columns["id"]["COLUMN_KEY"] == "PRI"
+    assert columns["id"]["EXTRA"] == "auto_increment"
+    assert columns["id"]["NUMERIC_PRECISION"] == 20
+    assert columns["name"]["CHARACTER_MAXIMUM_LENGTH"] == 100
+    assert columns["name"]["COLUMN_COMMENT"] == "姓名; 含分号"
+    assert columns["name"]["IS_NULLABLE"] == "YES"
+    assert columns["email"]["COLUMN_KEY"] == "UNI"
+    assert columns["email"]["IS_NULLABLE"] == "NO"
+    assert columns["status"]["COLUMN_DEFAULT"] == "1"
+    assert columns["balance"]["NUMERIC_PRECISION"] == 12
+    assert columns["balance"]["NUMERIC_SCALE"] == 2
+    assert columns["created_at"]["EXTRA"] == "DEFAULT_GENERATED"
+    assert columns["updated_at"]["EXTRA"] == (
+        "DEFAULT_GENERATED on update CURRENT_TIMESTAMP"
+    )
+    assert columns["updated_at"]["COLUMN_COMMENT"] == "it's"
+    assert columns["org_id"]["COLUMN_KEY"] == "MUL"
+
+    # 与 get_table_columns 一致：字段每属于一个索引占一行
+    status = [row for row in rows if row["COLUMN_NAME"] == "status"]
+    assert [row["INDEX_NAME"] for row in status] == ["idx_org_status", "idx_status"]
+    assert columns["note"]["INDEX_NAME"] is None
+
+
+def test_parse_create_table():
+    assert parse_create_table("DROP TABLE IF EXISTS `users`") is None
+    name, rows = parse_create_table(
+        "CREATE TABLE IF NOT EXISTS demo.t (id INT PRIMARY KEY, "
+        "code VARCHAR(20) NOT NULL UNIQUE, flag BOOLEAN DEFAULT TRUE, "
+        "uid CHAR(36) DEFAULT (uuid()))"
+    )
+    columns = _columns(rows)
+    assert name == "t"
+    assert columns["id"]["COLUMN_KEY"] == "PRI"
+    assert columns["id"]["INDEX_NAME"] == "PRIMARY"
+    assert columns["code"]["COLUMN_KEY"] == "UNI"
+    assert columns["flag"]["DATA_TYPE"] == "tinyint"
+    assert columns["uid"]["COLUMN_DEFAULT"] == "uuid()"
+    assert columns["uid"]["EXTRA"] == "DEFAULT_GENERATED"
+
+
+def test_parse_composite_unique():
+    _, rows = parse_create_table(
+        "CREATE TABLE t (a INT NOT NULL, b INT NOT NULL, c INT, "
+        "UNIQUE KEY uk_ab (a, b), KEY idx_c (c), UNIQUE KEY uk_c (c))"
+    )
+    columns = _columns(rows)
+    # 联合唯一索引的首列不唯一
+    assert columns["a"]["COLUMN_KEY"] == "MUL"
+    assert columns["b"]["COLUMN_KEY"] == ""
+    assert columns["c"]["COLUMN_KEY"] == "UNI"
+    model = SQLModelConversion("t", rows, "sqlite://").model()
+    fields = {line.split(":")[0].strip(): line for line in model.splitlines()}
+    assert "unique" not in fields["a"]
+    assert "unique=True" in fields["c"]
+
+
+def test_dump_to_conversion():
+    for name, rows in iter_dump(io.StringIO(DUMP)):
+        for conversion_class in (SQLModelConversion, TortoiseConversion):
+            files = conversion_class(name, rows, "mysql+pymysql://u:p@h/demo").gencode()
+            compile(files["model.py"], "model.py", "exec")
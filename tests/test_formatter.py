@@ -0,0 +1,26 @@
+import pytest
+
+from dfs_generate.conversion import SQLModelConversion
+from dfs_generate.formatter import Formatter, format_code
+from tests.test_conversion import MOCK_COLUMNS, MOCK_TABLE_NAME, MOCK_URI
+
+
+def test_format_code():
+    assert (
+        format_code("model.py", "import os,sys\nx=1")
+        == "import os\nimport sys\n\nx = 1\n"
+    )
+    # 非 Python 文件不做处理
+    assert format_code("api.ts", "x=1") == "x=1"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_formatter_format_files(workers):
+    files = SQLModelConversion(MOCK_TABLE_NAME, MOCK_COLUMNS, MOCK_URI).gencode()
+    expected = {name: format_code(name, code) for name, code in files.items()}
+    formatter = Formatter(workers=workers)
+    try:
+        assert formatter.format_files(files) == expected
+        assert list(formatter.format_files(files)) == list(files)
+    finally:
+        formatter.shutdown()
@@ -0,0 +1,243 @@
+import isort
+import pytest
+
+from dfs_generate.conversion import (
+    AsyncSQLModelConversion,
+    SQLModelConversion,
+    TortoiseConversion,
+)
+from dfs_generate.formatter import format_code
+from dfs_generate.layout import layout, overflows, render_imports, wrap_line
+from dfs_generate.tools import MySQLConf
+from tests.test_conversion import MOCK_COLUMNS, MOCK_URI
+
+
+def _column(name, data_type, **kwargs):
+    column = {
+        "COLUMN_NAME": name,
+        "DATA_TYPE": data_type,
+        "IS_NULLABLE": "YES",
+        "COLUMN_KEY": "",
+        "COLUMN_COMMENT": "",
+        "CHARACTER_MAXIMUM_LENGTH": None,
+        "NUMERIC_PRECISION": None,
+        "NUMERIC_SCALE": None,
+        "COLUMN_DEFAULT": None,
+        "EXTRA": "",
+    }
+    column.update(kwargs)
+    return column
+
+
+# 覆盖各类字段参数的宽表
+WIDE_COLUMNS = [
+    _column("id", "bigint", IS_NULLABLE="NO", COLUMN_KEY="PRI", COLUMN_COMMENT="主键"),
+    _column(
+        "user_account_display_name",
+        "varchar",
+        CHARACTER_MAXIMUM_LENGTH=255,
+        COLUMN_KEY="UNI",
+        COLUMN_COMMENT="用户账号的展示名称，用于页面显示",
+    ),
+    _column("balance", "decimal", NUMERIC_PRECISION=12, NUMERIC_SCALE=2),
+    _column(
+        "status", "tinyint", IS_NULLABLE="NO", COLUMN_DEFAULT="1", COLUMN_KEY="MUL"
+    ),
+    _column("profile", "json", COLUMN_COMMENT="扩展信息"),
+    _column("birthday", "date"),
+    _column("avatar", "blob"),
+    _column(
+        "created_at",
+        "datetime",
+        COLUMN_DEFAULT="CURRENT_TIMESTAMP",
+        EXTRA="DEFAULT_GENERATED",
+        COLUMN_COMMENT="创建时间",
+    ),
+    _column(
+        "updated_at",
+        "timestamp",
+        COLUMN_DEFAULT="CURRENT_TIMESTAMP",
+        EXTRA="DEFAULT_GENERATED on update CURRENT_TIMESTAMP",
+        COLUMN_COMMENT="更新时间",
+    ),
+    _column(
+        "last_login_update_at",
+        "timestamp",
+        EXTRA="DEFAULT_GENERATED on update CURRENT_TIMESTAMP",
+    ),
+]
+
+
+# 接近 MySQL 64 个字符上限的标识符与长注释，排版未覆盖的写法回退到 yapf
+LONG_NAME = "customer_subscription_billing_cycle_adjustment_history_records"
+LONG_COMMENT = "The identifier of the account that owns this record upstream"
+LONG_COLUMNS = [
+    _column(
+        "id", "bigint", IS_NULLABLE="NO", COLUMN_KEY="PRI", COLUMN_COMMENT=LONG_COMMENT
+    ),
+    _column(
+        LONG_NAME + "_a",
+        "decimal",
+        NUMERIC_PRECISION=20,
+        NUMERIC_SCALE=6,
+        COLUMN_COMMENT=LONG_COMMENT,
+    ),
+    _column(
+        LONG_NAME + "_b",
+        "varchar",
+        CHARACTER_MAXIMUM_LENGTH=255,
+        IS_NULLABLE="NO",
+        COLUMN_KEY="UNI",
+        COLUMN_COMMENT="用户账号在上游计费系统中的唯一标识，用于对账与结算，不可修改",
+    ),
+    _column(
+        LONG_NAME[:40],
+        "datetime",
+        COLUMN_DEFAULT="CURRENT_TIMESTAMP",
+        EXTRA="DEFAULT_GENERATED",
+        COLUMN_COMMENT=LONG_COMMENT,
+    ),
+    _column(LONG_NAME[:30], "json", COLUMN_KEY="MUL", COLUMN_COMMENT=LONG_COMMENT),
+]
+
+
+@pytest.mark.parametrize(
+    "conversion_class",
+    [SQLModelConversion, AsyncSQLModelConversion, TortoiseConversion],
+)
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"pagination": "cursor"},
+        {"list_strategy": "window"},
+        {"list_strategy": "has_more"},
+        {"pagination": "cursor", "list_strategy": "has_more"},
+    ],
+)
+@pytest.mark.parametrize(
+    "table_name,columns",
+    [
+        ("users", MOCK_COLUMNS),
+        ("user_login_history_records", MOCK_COLUMNS),
+        ("member_account", WIDE_COLUMNS),
+        (LONG_NAME, MOCK_COLUMNS),
+        ("member_account", LONG_COLUMNS),
+    ],
+)
+def test_preformatted_matches_formatter(conversion_class, options, table_name, columns):
+    expected = conversion_class(table_name, columns, MOCK_URI, **options).gencode()
+    actual = conversion_class(
+        table_name, columns, MOCK_URI, preformatted=True, **options
+    ).gencode()
+    assert actual.keys() == expected.keys()
+    for name, code in expected.items():
+        assert actual[name] == format_code(name, code), name
+
+
+@pytest.mark.parametrize("pagination", ["offset", "cursor"])
+def test_preformatted_gather(pagination):
+    """gather 仅 tortoise 支持"""
+    expected = TortoiseConversion(
+        "users", WIDE_COLUMNS, MOCK_URI, pagination=pagination, list_strategy="gather"
+    ).gencode()
+    actual = TortoiseConversion(
+        "users",
+        WIDE_COLUMNS,
+        MOCK_URI,
+        preformatted=True,
+        pagination=pagination,
+        list_strategy="gather",
+    ).gencode()
+    for name, code in expected.items():
+        assert actual[name] == format_code(name, code), name
+
+
+@pytest.mark.parametrize(
+    "imports",
+    [
+        {"from typing import Optional", "from sqlmodel import SQLModel, Field"},
+        {
+            "import schema",
+            "from typing import List, Optional",
+            "import model",
+            "from datetime import datetime",
+            "from sqlmodel import func, DateTime, Column",
+            "from sqlmodel import JSON",
+            "from pydantic import BaseModel, Field",
+            "from decimal import Decimal",
+        },
+        {
+            "from some_module import AAAA, BBBBBBBBBBBBBBBB, CCCCCCCCCCCCCCCCCC, "
+            "DDDDDDDDDDDDDD, eeeeeeeeee, Ffffffff"
+        },
+    ],
+)
+def test_render_imports(imports):
+    assert render_imports(imports) + "\n" == isort.code("\n".join(imports) + "\n")
+
+
+def test_wrap_line():
+    assert wrap_line("    f(a,b)") == "    f(a, b)"
+    line = "    name: Optional[str] = Field(default=None, max_length=255, nullable=True, index=True)"
+    assert wrap_line(line) == (
+        "    name: Optional[str] = Field(default=None,\n"
+        "                                max_length=255,\n"
+        "                                nullable=True,\n"
+        "                                index=True)"
+    )
+    # 无法解析的语句原样返回
+    assert wrap_line("    x = '" + "a" * 80) == "    x = '" + "a" * 80
+
+
+def test_layout_skips_multiline_string():
+    code = "x = '''\n" + "a" * 100 + "\n'''\n"
+    assert layout(code) == code
+    assert not overflows(code)
+    assert overflows(code + "y = " + "1 + " * 20 + "1\n")
+
+
+def test_wrap_line_leaves_nested_calls():
+    """参数中的调用还需拆分时保留原行，由 yapf 格式化"""
+    line = (
+        "    last_login_update_at: datetime = Field(default=None, "
+        "sa_column=Column(DateTime(), onupdate=func.now()))"
+    )
+    assert wrap_line(line) == line
+    assert overflows(line)
+
+
+def test_gencode_formatter():
+    """只有仍有超长行的文件交给 formatter"""
+    calls = []
+
+    class Recorder:
+        def format_files(self, files):
+            calls.append(sorted(files))
+            return {name: format_code(name, code) for name, code in files.items()}
+
+    conversion = SQLModelConversion("member_account", WIDE_COLUMNS, MOCK_URI, True)
+    actual = conversion.gencode(formatter=Recorder())
+    assert calls == [["model.py"]]
+    expected = SQLModelConversion("member_account", WIDE_COLUMNS, MOCK_URI).gencode()
+    assert actual["model.py"] == format_code("model.py", expected["model.py"])
+
+
+# 连接配置页的默认写法，连接地址所在行超出 79 列
+REAL_URI = MySQLConf(host="localhost", user="root", password="123456", db="test").db_uri
+
+
+@pytest.mark.parametrize(
+    "conversion_class,name",
+    [
+        (SQLModelConversion, "db.py"),
+        (AsyncSQLModelConversion, "db.py"),
+        (TortoiseConversion, "main.py"),
+    ],
+)
+def test_preformatted_db_uri(conversion_class, name):
+    """连接地址直接排版，不需要回退到 yapf"""
+    code = conversion_class("users", MOCK_COLUMNS, REAL_URI, True).gencode([name])[name]
+    assert not overflows(code)
+    expected = conversion_class("users", MOCK_COLUMNS, REAL_URI).gencode([name])
+    assert code == format_code(name, expected[name])
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+import time
+
+import bottle
+
+from dfs_generate import metrics, server
+from dfs_generate.metrics import Summary
+
+
+def _call(path, query=""):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "wsgi.input": io.BytesIO(),
+    }
+    status, headers = [], {}
+
+    def start_response(line, items, exc_info=None):
+        status.append(line)
+        headers.update(items)
+
+    body = b"".join(server.app(environ, start_response))
+    return status[0], headers, body
+
+
+class _Index:
+    def search(self, like, match, ignore_case, offset, limit):
+        return 1, ["user"]
+
+
+def test_summary():
+    summary = Summary("demo_seconds", "demo", window=100)
+    labels = (("endpoint", "/codegen"), ("stage", "convert"))
+    for i in range(1, 201):
+        summary.observe(labels, i / 1000)
+    # 分位数只取最近 100 个样本
+    assert summary.quantiles(labels) == {0.5: 0.151, 0.95: 0.196, 0.99: 0.2}
+
+    text = summary.render()
+    assert "# TYPE demo_seconds summary" in text
+    assert 'demo_seconds{endpoint="/codegen",stage="convert",quantile="0.99"}' in text
+    assert 'demo_seconds_count{endpoint="/codegen",stage="convert"} 200' in text
+    assert 'demo_seconds_sum{endpoint="/codegen",stage="convert"} 20.100000' in text
+
+
+def test_timed_outside_request():
+    # 后台线程等不在请求内时不记录，也不报错
+    with metrics.timed("convert"):
+        pass
+
+
+class _Formatter:
+    def format_files(self, files):
+        time.sleep(0.02)
+        return files
+
+
+def test_timed_nested():
+    bottle.request.bind({"REQUEST_METHOD": "GET", "wsgi.input": io.BytesIO()})
+    with metrics.timed("convert"):
+        # 进程池中的 yapf + isort 单独计入 format，不重复计入 convert
+        server._TimedFormatter(_Formatter()).format_files({"model.py": ""})
+    timings = bottle.request.environ["dfs.timings"]
+    assert timings["format"] >= 0.02 > timings["convert"]
+
+
+def test_server_timing(monkeypatch):
+    @contextlib.contextmanager
+    def fake_mysql(conf=None):
+        with metrics.timed("connect"):
+            pass
+        yield object()
+
+    monkeypatch.setattr(server, "_mysql", fake_mysql)
+    monkeypatch.setattr(server.table_indexes, "get_index", lambda obj: _Index())
+    metrics.stage_seconds.clear()
+
+    status, headers, _ = _call("/tables")
+    assert status.startswith("200")
+    stages = [item.split(";")[0] for item in headers["Server-Timing"].split(", ")]
+    assert stages == ["connect", "introspect", "search", "serialize", "total"]
+
+    status, headers, body = _call("/metrics")
+    assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = body.decode("utf-8")
+    assert 'dfs_stage_seconds_count{endpoint="/tables",stage="introspect"} 1' in text
+    assert 'dfs_stage_seconds{endpoint="/tables",stage="total",quantile="0.5"}' in text
+
+
+def test_tables_negative_page(monkeypatch):
+    monkeypatch.setattr(server, "_mysql", lambda conf=None: contextlib.nullcontext())
+    monkeypatch.setattr(server.table_indexes, "get_index", lambda obj: _Index())
+    assert json.loads(_call("/tables", "limit=1")[2])["code"] == 20000
+    for query in ("offset=-1", "limit=-1", "offset=1&limit=-2"):
+        assert json.loads(_call("/tables", query)[2])["code"] == 40000
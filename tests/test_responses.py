@@ -0,0 +1,94 @@
+import gzip
+import io
+import json
+
+import bottle
+
+from dfs_generate import responses
+from dfs_generate.responses import (
+    accepted_encoding,
+    conditional,
+    entity_tag,
+    etag_matches,
+    not_modified,
+    with_suffix,
+)
+
+BODY = {"code": 20000, "data": ["x" * 40] * 100}
+
+
+def _request(**headers):
+    environ = {"REQUEST_METHOD": "GET", "wsgi.input": io.BytesIO()}
+    for name, value in headers.items():
+        environ["HTTP_" + name.upper()] = value
+    bottle.request.bind(environ)
+    bottle.response.bind()
+
+
+def test_etag_matches():
+    etag = entity_tag("fingerprint", "sqlmodel")
+    assert etag == entity_tag("fingerprint", "sqlmodel") != entity_tag("fingerprint")
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag, f'"other", W/{etag[:-1]}-gzip"')
+    assert etag_matches(etag, "*")
+    assert not etag_matches(etag, '"other"')
+    assert not etag_matches(etag, None)
+
+
+def test_accepted_encoding(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert accepted_encoding("gzip, deflate, br") == "gzip"
+    assert accepted_encoding("gzip;q=0, deflate") is None
+    assert accepted_encoding("*") == "gzip"
+    assert accepted_encoding(None) is None
+
+
+def test_conditional():
+    handler = conditional(lambda: BODY)
+
+    _request(accept_encoding="gzip")
+    data = handler()
+    etag = bottle.response.get_header("ETag")
+    assert bottle.response.get_header("Content-Encoding") == "gzip"
+    assert bottle.response.get_header("Vary") == "Accept-Encoding"
+    assert etag.endswith('-gzip"')
+    assert json.loads(gzip.decompress(data)) == BODY
+
+    # 客户端带上压缩表示的 ETag 同样命中
+    _request(accept_encoding="gzip", if_none_match=etag)
+    assert handler() == b""
+    assert bottle.response.status_code == 304
+    # 304 的 ETag 与 200 时相同
+    assert bottle.response.get_header("ETag") == etag
+
+    # 小响应不压缩
+    _request(accept_encoding="gzip")
+    small = conditional(lambda: {"code": 20000})()
+    assert json.loads(small) == {"code": 20000}
+    assert bottle.response.get_header("Content-Encoding") is None
+
+
+def test_conditional_route_etag():
+    calls = []
+
+    @conditional
+    def handler():
+        etag = entity_tag("fingerprint")
+        if not_modified(etag):
+            return None
+        calls.append(1)
+        bottle.response.set_header("ETag", etag)
+        return BODY
+
+    _request()
+    handler()
+    assert bottle.response.get_header("ETag") == entity_tag("fingerprint")
+    _request(if_none_match=entity_tag("fingerprint"))
+    assert handler() == b"" and bottle.response.status_code == 304
+    # 命中时跳过生成
+    assert calls == [1]
+    # 路由提前返回 304 时沿用客户端所持压缩表示的 ETag
+    gzipped = with_suffix(entity_tag("fingerprint"), "gzip")
+    _request(accept_encoding="gzip", if_none_match=gzipped)
+    assert handler() == b""
+    assert bottle.response.get_header("ETag") == gzipped
@@ -1,6 +1,18 @@
+import os
+
 import pytest
 from dfs_generate.tools import tran, to_pascal, to_snake
-from dfs_generate.tools import MySQLConf
+from dfs_generate.tools import (
+    Cache,
+    MetadataCache,
+    MySQLConf,
+    MySQLHelper,
+    MySQLPool,
+    TableIndex,
+    TableIndexCache,
+    close_pools,
+    get_pool,
+)
 
 
 # 测试 tran 函数
@@ -72,3 +84,363 @@ def test_mysqlconf_json():
         "charset": "utf8mb4",
     }
     assert conf.json() == expected_json
+
+
+class FakeCursor:
+    """按 SQL 返回预置结果，并记录执行过的语句"""
+
+    def __init__(self, results):
+        self.results = results
+        self.executed = []
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        self._rows = [dict(row) for row in self.results.get(sql, [])]
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, results):
+        self._cursor = FakeCursor(results)
+
+    def cursor(self):
+        return self._cursor
+
+    def close(self):
+        pass
+
+
+SCHEMA_CONF = MySQLConf(host="localhost", user="u", password="p", db="test_db")
+
+
+def test_get_schema_columns(monkeypatch):
+    from dfs_generate import tools
+
+    results = {
+        MySQLHelper.GET_SCHEMA_COLUMNS: [
+            {"TABLE_NAME": "users", "COLUMN_NAME": "name", "ORDINAL_POSITION": 2},
+            {"TABLE_NAME": "users", "COLUMN_NAME": "id", "ORDINAL_POSITION": 1},
+            {"TABLE_NAME": "orders", "COLUMN_NAME": "user_id", "ORDINAL_POSITION": 1},
+        ],
+        MySQLHelper.GET_SCHEMA_STATISTICS: [
+            {
+                "TABLE_NAME": "users",
+                "COLUMN_NAME": "id",
+                "NON_UNIQUE": 0,
+                "INDEX_NAME": "PRIMARY",
+            },
+            {
+                "TABLE_NAME": "users",
+                "COLUMN_NAME": "name",
+                "NON_UNIQUE": 1,
+                "INDEX_NAME": "idx_a",
+            },
+            {
+                "TABLE_NAME": "users",
+                "COLUMN_NAME": "name",
+                "NON_UNIQUE": 1,
+                "INDEX_NAME": "idx_b",
+            },
+        ],
+    }
+    conn = FakeConnection(results)
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kwargs: conn)
+
+    with MySQLHelper(SCHEMA_CONF) as obj:
+        data = obj.get_schema_columns()
+
+    # 固定两次查询，与表数量无关
+    assert len(conn.cursor().executed) == 2
+    assert [c["COLUMN_NAME"] for c in data["users"]] == ["id", "name", "name"]
+    assert [c["INDEX_NAME"] for c in data["users"]] == ["PRIMARY", "idx_a", "idx_b"]
+    assert data["orders"][0]["INDEX_NAME"] is None
+
+
+def test_get_schema_columns_filter_tables(monkeypatch):
+    from dfs_generate import tools
+
+    conn = FakeConnection({})
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kwargs: conn)
+
+    with MySQLHelper(SCHEMA_CONF) as obj:
+        assert obj.get_schema_columns([]) == {}
+        obj.get_schema_columns(["users", "orders"])
+
+    sql, params = conn.cursor().executed[0]
+    assert sql.endswith("and TABLE_NAME in %s")
+    assert params == ["test_db", ("users", "orders")]
+
+
+class PoolConnection(FakeConnection):
+    def __init__(self):
+        super().__init__({})
+        self.pings = 0
+        self.closed = False
+
+    def ping(self, reconnect=True):
+        self.pings += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_mysql_conf_fingerprint():
+    other = MySQLConf(host="localhost", user="u", password="p", db="other_db")
+    assert SCHEMA_CONF.fingerprint == MySQLConf(**SCHEMA_CONF.json()).fingerprint
+    assert SCHEMA_CONF.fingerprint != other.fingerprint
+
+
+def test_pool_reuses_connection(monkeypatch):
+    from dfs_generate import tools
+
+    created = []
+
+    def connect(**kwargs):
+        created.append(PoolConnection())
+        return created[-1]
+
+    monkeypatch.setattr(tools.pymysql, "connect", connect)
+    pool = MySQLPool(SCHEMA_CONF, max_size=2)
+    with MySQLHelper(SCHEMA_CONF, pool=pool) as obj:
+        first = obj.conn
+    with MySQLHelper(SCHEMA_CONF, pool=pool) as obj:
+        assert obj.conn is first
+    assert len(created) == 1
+    assert first.pings == 1
+    assert not first.closed
+
+
+def test_pool_evicts_idle_and_bounds_size(monkeypatch):
+    from dfs_generate import tools
+
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kw: PoolConnection())
+    pool = MySQLPool(SCHEMA_CONF, max_size=1, idle_timeout=0, timeout=0.01)
+    conn = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(conn)
+    # 空闲超时的连接被关闭，重新建立新连接
+    assert pool.acquire() is not conn
+    assert conn.closed
+
+
+def test_get_pool_by_fingerprint():
+    assert get_pool(SCHEMA_CONF) is get_pool(MySQLConf(**SCHEMA_CONF.json()))
+
+
+def test_pool_evicts_on_release(monkeypatch):
+    from dfs_generate import tools
+
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kw: PoolConnection())
+    pool = MySQLPool(SCHEMA_CONF, max_size=2, idle_timeout=0)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    # 归还连接时关闭空闲超时的连接，不必等到下一次取用
+    pool.release(second)
+    assert first.closed
+    assert not second.closed
+
+
+def test_close_pools(monkeypatch):
+    from dfs_generate import tools
+
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kw: PoolConnection())
+    monkeypatch.setattr(tools, "_pools", {})
+    other = MySQLConf(host="localhost", user="u", password="p", db="other_db")
+    old, kept = get_pool(other), get_pool(SCHEMA_CONF)
+    idle, busy = old.acquire(), old.acquire()
+    old.release(idle)
+
+    close_pools(keep=SCHEMA_CONF)
+    assert idle.closed
+    assert get_pool(SCHEMA_CONF) is kept
+    assert get_pool(other) is not old
+    # 使用中的连接归还到已关闭的连接池时关闭
+    old.release(busy)
+    assert busy.closed
+
+
+def test_metadata_cache(monkeypatch):
+    from dfs_generate import tools
+
+    fingerprint = {
+        "COLUMNS_CHECKSUM": "2:1",
+        "STATISTICS_CHECKSUM": "1:1",
+        "CREATE_TIME": None,
+    }
+    results = {
+        MySQLHelper.GET_TABLE_FINGERPRINT: [fingerprint],
+        MySQLHelper.GET_TABLE_COLUMNS: [{"COLUMN_NAME": "id", "ORDINAL_POSITION": 1}],
+    }
+    conn = FakeConnection(results)
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kwargs: conn)
+    metadata = MetadataCache()
+
+    def heavy_queries():
+        executed = conn.cursor().executed
+        return sum(sql == MySQLHelper.GET_TABLE_COLUMNS for sql, _ in executed)
+
+    with MySQLHelper(SCHEMA_CONF) as obj:
+        first = metadata.get_table_columns(obj, "users")
+        assert metadata.get_table_columns(obj, "users") is first
+        assert heavy_queries() == 1
+
+        # 表结构变化后重新查询
+        fingerprint["COLUMNS_CHECKSUM"] = "3:2"
+        assert metadata.get_table_columns(obj, "users") is not first
+        assert heavy_queries() == 2
+
+
+def test_table_index_search():
+    index = TableIndex(["user_role", "Orders", "users", "order_item", "sys_user"])
+    assert index.search() == (
+        5,
+        ["order_item", "Orders", "sys_user", "user_role", "users"],
+    )
+    assert index.search("user", "prefix") == (2, ["user_role", "users"])
+    assert index.search("order", "prefix") == (1, ["order_item"])
+    assert index.search("order", "prefix", ignore_case=True) == (
+        2,
+        ["order_item", "Orders"],
+    )
+    assert index.search("user") == (3, ["sys_user", "user_role", "users"])
+    assert index.search("ORDER", ignore_case=True)[0] == 2
+    assert index.search("user", offset=1, limit=1) == (3, ["user_role"])
+    assert index.search("missing") == (0, [])
+
+
+def test_table_index_cache(monkeypatch):
+    from dfs_generate import tools
+
+    fingerprint = {"TABLES_CHECKSUM": "1:100:"}
+    tables = [{"TABLE_NAME": "users"}]
+    results = {
+        MySQLHelper.GET_SCHEMA_FINGERPRINT: [fingerprint],
+        MySQLHelper.GET_TABLES: tables,
+    }
+    conn = FakeConnection(results)
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kwargs: conn)
+    indexes = TableIndexCache()
+
+    with MySQLHelper(SCHEMA_CONF) as obj:
+        first = indexes.get_index(obj)
+        assert indexes.get_index(obj) is first
+        assert first.names == ["users"]
+
+        # 新增表后重建索引
+        tables.append({"TABLE_NAME": "orders"})
+        fingerprint["TABLES_CHECKSUM"] = "2:300:"
+        assert indexes.get_index(obj).names == ["orders", "users"]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    os.makedirs(tmp_path / ".cache")
+    obj = Cache()
+    obj.start()
+    return obj
+
+
+def test_cache_code(cache):
+    code = [{"name": "model.py", "code": "print('你好')", "key": "model.py"}]
+    assert cache.get_code("k") is None
+    cache.set_code("k", code)
+    assert cache.get_code("k") == code
+
+
+def test_cache_code_eviction(cache):
+    cache.code_max_entries = 2
+    for key in ("a", "b", "c"):
+        cache.set_code(key, [key])
+    # 最久未访问的被淘汰
+    assert cache.get_code("a") is None
+    assert cache.get_code("c") == ["c"]
+
+    cache.code_max_bytes = len('["d"]')
+    cache.set_code("d", ["d"])
+    assert cache.get_code("b") is None
+    assert cache.get_code("d") == ["d"]
+
+
+def test_cache_conf(cache, tmp_path):
+    assert cache.get() is None
+    conf = MySQLConf("127.0.0.1", "root", "123456", "demo").json()
+    cache.set(**conf)
+    cache.set(**dict(conf, db="demo2"))
+    assert cache.get() == dict(conf, db="demo2")
+    # 返回副本，修改不影响缓存
+    cache.get()["db"] = "other"
+    assert cache.get()["db"] == "demo2"
+
+    # 配置只保存一行，重启后从磁盘读取
+    cache.close()
+    obj = Cache()
+    obj.start()
+    assert obj.get() == dict(conf, db="demo2")
+    assert obj._conn.execute("SELECT COUNT(*) FROM conf").fetchone()[0] == 1
+    assert obj._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    obj.close()
+
+
+def test_cache_conf_legacy_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    os.makedirs(tmp_path / ".cache")
+    obj = Cache()
+    obj.start()
+    # 旧版本每次配置追加一行
+    with obj._conn:
+        for db in ("a", "b", "c"):
+            obj._conn.execute(
+                "INSERT INTO conf (user, password, host, port, db, charset) "
+                "VALUES ('root', '', 'localhost', 3306, ?, 'utf8')",
+                (db,),
+            )
+    obj.close()
+    obj.start()
+    assert obj.get()["db"] == "c"
+    obj.set(**dict(obj.get(), db="d"))
+    assert obj._conn.execute("SELECT db FROM conf").fetchall() == [("d",)]
+    obj.close()
+
+
+def test_cache_lazy_start(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    obj = Cache()
+    # 创建时不访问磁盘，首次读写时才打开数据库
+    assert obj._conn is None and not os.path.exists(obj.db_path)
+    assert obj.get_code("k") is None
+    assert os.path.exists(obj.db_path)
+    obj.close()
+    assert Cache().get() is None
+
+
+def test_column_info():
+    from dfs_generate.tools import ColumnInfo
+
+    row = {
+        "COLUMN_NAME": "name",
+        "DATA_TYPE": "varchar",
+        "IS_NULLABLE": "YES",
+        "COLUMN_KEY": "MUL",
+        "CHARACTER_MAXIMUM_LENGTH": 64,
+        "EXTRA": None,
+        "INDEX_NAME": "idx_name",
+    }
+    column = ColumnInfo.from_row(row)
+    assert (column.name, column.nullable, column.max_length) == ("name", True, 64)
+    assert column.extra == "" and column.indexes == ["idx_name"]
+    assert ColumnInfo(*column.astuple()) == column
+    assert not hasattr(column, "__dict__")
+    # 只查询生成代码用到的列
+    assert "c.*" not in MySQLHelper.GET_TABLE_COLUMNS
+    assert "select *" not in MySQLHelper.GET_SCHEMA_COLUMNS
@@ -0,0 +1,58 @@
+import pytest
+
+from dfs_generate.tools import MySQLHelper
+from dfs_generate.watch import SchemaWatcher
+from tests.test_tools import SCHEMA_CONF, FakeConnection
+
+
+def _row(table, columns="2:10"):
+    return {
+        "TABLE_NAME": table,
+        "COLUMNS_CHECKSUM": columns,
+        "STATISTICS_CHECKSUM": "1:5",
+        "CREATE_TIME": None,
+    }
+
+
+@pytest.fixture
+def schema(monkeypatch):
+    from dfs_generate import tools
+
+    rows = [_row("users"), _row("orders"), _row("sys_log")]
+    conn = FakeConnection({MySQLHelper.GET_SCHEMA_TABLE_FINGERPRINTS: rows})
+    monkeypatch.setattr(tools.pymysql, "connect", lambda **kwargs: conn)
+    return rows, conn.cursor()
+
+
+def test_schema_watcher(schema):
+    rows, cursor = schema
+    calls = []
+    watcher = SchemaWatcher(SCHEMA_CONF, lambda helper, tables: calls.append(tables))
+
+    with MySQLHelper(SCHEMA_CONF) as helper:
+        assert watcher.poll(helper) == ["orders", "sys_log", "users"]
+        assert watcher.poll(helper) == []
+
+        rows[0] = _row("users", "3:12")
+        rows.append(_row("items"))
+        assert watcher.poll(helper) == ["items", "users"]
+    assert calls == [["orders", "sys_log", "users"], ["items", "users"]]
+    # 每次轮询只有一次聚合查询
+    assert len(cursor.executed) == 3
+
+
+def test_schema_watcher_filter_and_retry(schema):
+    rows, _ = schema
+
+    def on_change(helper, tables):
+        raise RuntimeError("生成失败")
+
+    watcher = SchemaWatcher(SCHEMA_CONF, on_change, tables=["user*", "orders"])
+    with MySQLHelper(SCHEMA_CONF) as helper:
+        assert watcher.poll(helper, notify=False) == ["orders", "users"]
+        rows[1] = _row("orders", "3:12")
+        with pytest.raises(RuntimeError):
+            watcher.poll(helper)
+        # 回调失败时不记录新指纹，下次仍视为变化
+        watcher.on_change = lambda helper, tables: None
+        assert watcher.poll(helper) == ["orders"]
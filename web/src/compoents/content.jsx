@@ -13,7 +13,8 @@ import { useEffect, useState } from 'react'
 import {
   CodepenOutlined,
   SettingOutlined,
-  RedditOutlined
+  RedditOutlined,
+  ThunderboltOutlined
 } from '@ant-design/icons'
 import CodeGenerate from '../compoents/codegen'
 import { host } from '../conf'
@@ -170,6 +171,18 @@ const DFSContent = () => {
               SQLModel
             </Button>
           </Form.Item>
+          <Form.Item>
+            <Button
+              onClick={() => {
+                setOpenDrawer(true)
+                setMode('sqlmodel_async')
+              }}
+              disabled={!selectTable.length}
+            >
+              <ThunderboltOutlined />
+              SQLModel Async
+            </Button>
+          </Form.Item>
           <Form.Item>
             <Button
               onClick={() => {